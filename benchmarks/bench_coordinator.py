@@ -0,0 +1,187 @@
+"""Benchmark PostNLCoordinator refreshes against a local fake PostNL server.
+
+Usage: python benchmarks/bench_coordinator.py [--shipments 10 100 1000] [--latency 0.05]
+       [--error-rate 0.0] [--cycles 5] [--cold] [--rate-limit 5] [--json results.json]
+
+Requires the packages from requirements-dev.txt.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.config_entries import current_entry  # noqa: E402
+from homeassistant.helpers.config_entry_oauth2_flow import (  # noqa: E402
+    LocalOAuth2Implementation, OAuth2Session)
+from homeassistant.helpers.json import json_dumps  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry, async_test_home_assistant)
+
+from benchmarks.fake_postnl import FakePostNLConfig, start_fake_postnl  # noqa: E402
+from custom_components.postnl import AsyncConfigEntryAuth  # noqa: E402
+from custom_components.postnl.const import (  # noqa: E402
+    DATA_SCHEDULER, DOMAIN, RATE_LIMIT_BURST)
+from custom_components.postnl.coordinator import PostNLCoordinator  # noqa: E402
+from custom_components.postnl.graphql import PostNLGraphql  # noqa: E402
+from custom_components.postnl.http_client import PostNLHttpClient  # noqa: E402
+from custom_components.postnl.jouw_api import PostNLJouwAPI  # noqa: E402
+from custom_components.postnl.login_api import PostNLLoginAPI  # noqa: E402
+from custom_components.postnl.scheduler import PostNLScheduler  # noqa: E402
+from custom_components.postnl.sensor import PostNLDelivery  # noqa: E402
+
+
+def redirect_clients(base_url: str) -> None:
+    """Point the API clients at the fake server."""
+    PostNLGraphql.endpoint = base_url + "/account/api/graphql"
+    PostNLJouwAPI.base_url = base_url + "/track-and-trace/"
+    PostNLLoginAPI.base_url = base_url + "/login/"
+
+
+def reset_caches(coordinator: PostNLCoordinator, jouw_api: PostNLJouwAPI) -> None:
+    """Forget everything learned in previous cycles."""
+    coordinator.track_and_trace_cache = type(coordinator.track_and_trace_cache)()
+    coordinator.previous_packages.clear()
+    coordinator.delivered_packages.clear()
+    coordinator.delivered_refreshed_at = None
+    jouw_api.validators.clear()
+
+
+async def run_scenario(config: FakePostNLConfig, cycles: int, cold: bool, rate_limit: float | None) -> dict:
+    fake, runner, base_url = await start_fake_postnl(config)
+    redirect_clients(base_url)
+
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            async with async_test_home_assistant(config_dir=config_dir) as hass:
+                entry = MockConfigEntry(domain=DOMAIN, data={
+                    'auth_implementation': DOMAIN,
+                    'token': {
+                        'access_token': 'bench-token',
+                        'refresh_token': 'bench-refresh',
+                        'expires_at': time.time() + 3600,
+                    },
+                })
+                entry.add_to_hass(hass)
+
+                # Back-to-back cycles of a single entry, so no staggering; the per-host
+                # budget only applies when asked for, otherwise it dominates large scenarios.
+                hass.data.setdefault(DOMAIN, {})[DATA_SCHEDULER] = PostNLScheduler(
+                    stagger=timedelta(0),
+                    rate=rate_limit or 1e9,
+                    burst=RATE_LIMIT_BURST
+                )
+
+                implementation = LocalOAuth2Implementation(
+                    hass, DOMAIN, 'bench', '', base_url + '/login/authorize', base_url + '/login/token')
+                http = PostNLHttpClient(hass, 'bench-token')
+                jouw_api = PostNLJouwAPI(http)
+                hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+                    'auth': AsyncConfigEntryAuth(OAuth2Session(hass, entry, implementation), http),
+                    'http': http,
+                    'graphql': PostNLGraphql(http),
+                    'jouw_api': jouw_api,
+                }
+
+                current_entry.set(entry)
+                coordinator = PostNLCoordinator(hass)
+                userinfo = {'account_id': 'bench-account', 'email': 'bench@example.com'}
+                sensor = None
+
+                cycle_times = []
+                render_times = []
+                peak_threads = threading.active_count()
+
+                tracemalloc.start()
+                for _ in range(cycles):
+                    if cold:
+                        reset_caches(coordinator, jouw_api)
+
+                    start = time.perf_counter()
+                    await coordinator.async_refresh()
+                    cycle_times.append(time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    if sensor is None:
+                        sensor = PostNLDelivery(coordinator, userinfo, 'bench-account_delivery', 'PostNL_delivery')
+                    sensor.handle_coordinator_data()
+                    json_dumps(sensor.extra_state_attributes)
+                    render_times.append(time.perf_counter() - start)
+
+                    peak_threads = max(peak_threads, threading.active_count())
+                _, peak_memory = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                await http.async_close()
+    finally:
+        await runner.cleanup()
+
+    return {
+        'shipments': config.shipments,
+        'latency': config.latency,
+        'error_rate': config.error_rate,
+        'cold': cold,
+        'first_cycle': cycle_times[0],
+        'steady_cycle': sum(cycle_times[1:]) / len(cycle_times[1:]) if len(cycle_times) > 1 else None,
+        'render': sum(render_times) / len(render_times),
+        'requests': dict(fake.requests),
+        'requests_per_cycle': sum(
+            count for name, count in fake.requests.items() if name not in ('errors', 'not_modified')
+        ) / cycles,
+        'peak_memory_kib': peak_memory / 1024,
+        'peak_threads': peak_threads,
+        'last_update_success': coordinator.last_update_success,
+    }
+
+
+def print_results(results: list[dict]) -> None:
+    header = f"{'shipments':>9} {'first (s)':>10} {'steady (s)':>10} {'render (ms)':>11} {'req/cycle':>9} {'peak KiB':>9} {'threads':>7}"
+    print(header)
+    print('-' * len(header))
+
+    for result in results:
+        steady = f"{result['steady_cycle']:.3f}" if result['steady_cycle'] is not None else '-'
+        print(
+            f"{result['shipments']:>9} {result['first_cycle']:>10.3f} {steady:>10} "
+            f"{result['render'] * 1000:>11.2f} {result['requests_per_cycle']:>9.1f} "
+            f"{result['peak_memory_kib']:>9.0f} {result['peak_threads']:>7}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shipments', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--latency', type=float, default=0.05, help="Server latency per request in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with a 503")
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--cold', action='store_true', help="Clear all caches before every cycle")
+    parser.add_argument('--no-etag', action='store_true', help="Do not send ETags from the fake server")
+    parser.add_argument('--rate-limit', type=float, help="Requests per second per host, unlimited when omitted")
+    parser.add_argument('--json', type=Path, help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for shipments in args.shipments:
+        config = FakePostNLConfig(
+            shipments=shipments,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            etag=not args.no_etag
+        )
+        results.append(await run_scenario(config, args.cycles, args.cold, args.rate_limit))
+
+    print_results(results)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""Measure the import cost of the PostNL integration on the Home Assistant startup path.
+
+Usage: python benchmarks/bench_import.py [--rev REV] [--runs 5] [--top 10]
+
+The Home Assistant modules the integration depends on are imported first, as they are
+already loaded when Home Assistant sets up the integration. Only what the integration
+pulls in on top of that is counted. With --rev, the same measurement runs against a
+git worktree of that revision, so a before and after can be compared.
+
+Requires the packages from requirements-dev.txt.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+MARKER = "--- postnl ---"
+
+PRELOAD = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_entry_oauth2_flow",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.storage",
+    "homeassistant.components.sensor",
+    "aiohttp",
+)
+
+MODULES = (
+    "custom_components.postnl",
+    "custom_components.postnl.config_flow",
+    "custom_components.postnl.sensor",
+)
+
+HEAVY = ("gql", "graphql", "requests", "urllib3")
+
+
+def measure(tree: Path) -> tuple[float, dict[str, int]]:
+    """Import the integration once in a fresh interpreter, return the total and the time per top-level package."""
+    code = "\n".join((
+        "import sys",
+        *(f"import {module}" for module in PRELOAD),
+        f"sys.stderr.write({MARKER!r} + '\\n')",
+        *(f"import {module}" for module in MODULES),
+    ))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=tree,
+        env={**os.environ, "PYTHONPATH": str(tree)},
+        capture_output=True,
+        text=True,
+    )
+
+    if result.returncode:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Importing the integration from {tree} failed:\n" + "\n".join(errors))
+
+    lines = result.stderr.split(MARKER, 1)[1].splitlines()
+    total = 0
+    per_package: dict[str, int] = {}
+
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        total += int(self_us)
+        per_package[package] = per_package.get(package, 0) + int(self_us)
+
+    return total / 1000, per_package
+
+
+def run(tree: Path, runs: int) -> dict:
+    samples = [measure(tree) for _ in range(runs)]
+    _, per_package = samples[-1]
+
+    return {
+        "median_ms": statistics.median(total for total, _ in samples),
+        "per_package_ms": {package: us / 1000 for package, us in per_package.items()},
+        "heavy": sorted(package for package in per_package if package in HEAVY),
+    }
+
+
+def print_result(label: str, result: dict, top: int) -> None:
+    print(f"{label}: {result['median_ms']:.1f} ms")
+    print(f"  heavy client libraries imported: {', '.join(result['heavy']) or 'none'}")
+
+    for package, ms in sorted(result["per_package_ms"].items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {package:<30} {ms:>8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rev", help="Also measure this git revision, e.g. the commit before a change")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Number of top-level packages to list")
+    args = parser.parse_args()
+
+    if args.rev:
+        with tempfile.TemporaryDirectory() as worktree:
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, args.rev], cwd=ROOT, check=True,
+                           capture_output=True)
+            try:
+                print_result(args.rev, run(Path(worktree), args.runs), args.top)
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, check=True)
+
+    print_result("working tree", run(ROOT, args.runs), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Local stand-in for the PostNL GraphQL, track and trace, userinfo and token endpoints."""
+import asyncio
+import hashlib
+import json
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+
+@dataclass
+class FakePostNLConfig:
+    shipments: int = 10
+    latency: float = 0.05
+    error_rate: float = 0.0
+    delivered_ratio: float = 0.5
+    etag: bool = True
+    seed: int = 1
+
+
+@dataclass
+class FakePostNL:
+    """aiohttp application serving deterministic PostNL responses."""
+
+    config: FakePostNLConfig
+    requests: Counter = field(default_factory=Counter)
+
+    def __post_init__(self) -> None:
+        rng = random.Random(self.config.seed)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+
+        self.shipments = []
+        self.colli = {}
+
+        for index in range(self.config.shipments):
+            key = f"KEY{index:05d}"
+            barcode = f"3SBENCH{index:07d}"
+            delivered = rng.random() < self.config.delivered_ratio
+            window_start = now + timedelta(hours=rng.randint(-2, 72))
+            window_end = window_start + timedelta(hours=2)
+
+            self.shipments.append({
+                'key': key,
+                'creationDateTime': (now - timedelta(days=rng.randint(0, 20))).isoformat(),
+                'title': f"Package {index}",
+                'barcode': barcode,
+                'delivered': delivered,
+                'deliveredTimeStamp': (now - timedelta(days=rng.randint(0, 20))).isoformat() if delivered else None,
+                'deliveryWindowFrom': window_start.isoformat(),
+                'deliveryWindowTo': window_end.isoformat(),
+                'deliveryWindowType': 'Window',
+                'detailsUrl': f"https://jouw.postnl.nl/track-and-trace/{key}",
+                'shipmentType': 'Parcel',
+                'deliveryAddressType': 'Recipient',
+                'sourceAccountId': None,
+                'sourceDisplayName': None,
+                '__typename': 'TrackedShipmentResultType',
+            })
+            self.colli[key] = json.dumps({
+                'colli': {
+                    barcode: {
+                        'routeInformation': {
+                            'plannedDeliveryTime': window_start.isoformat(),
+                            'plannedDeliveryTimeWindow': {
+                                'startDateTime': window_start.isoformat(),
+                                'endDateTime': window_end.isoformat(),
+                            },
+                            'expectedDeliveryTime': None,
+                        },
+                        'statusPhase': {'index': rng.randint(1, 3), 'message': 'Pakket is onderweg'},
+                        # Real responses carry much more than the fields the integration reads.
+                        'observations': [
+                            {'observationDate': (now - timedelta(hours=hour)).isoformat(), 'description': 'Scan'}
+                            for hour in range(20)
+                        ],
+                    }
+                }
+            }).encode()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        path = request.path
+
+        if path.endswith('/graphql'):
+            endpoint = 'graphql'
+        elif '/trackAndTrace/' in path:
+            endpoint = 'track_and_trace'
+        elif path.endswith('/userinfo'):
+            endpoint = 'userinfo'
+        elif path.endswith('/token'):
+            endpoint = 'token'
+        else:
+            raise web.HTTPNotFound()
+
+        self.requests[endpoint] += 1
+        await asyncio.sleep(self.config.latency)
+
+        if endpoint != 'token' and random.random() < self.config.error_rate:
+            self.requests['errors'] += 1
+            raise web.HTTPServiceUnavailable()
+
+        if endpoint == 'graphql':
+            body = await request.json()
+            if 'trackedShipments' not in body['query']:
+                raise web.HTTPBadRequest()
+
+            return web.json_response({'data': {'trackedShipments': {
+                'receiverShipments': self.shipments,
+                'senderShipments': [],
+                '__typename': 'TrackedShipments',
+            }}})
+
+        if endpoint == 'track_and_trace':
+            body = self.colli.get(path.rsplit('/', 1)[-1])
+            if body is None:
+                raise web.HTTPNotFound()
+
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.config.etag and request.headers.get('If-None-Match') == etag:
+                self.requests['not_modified'] += 1
+                return web.Response(status=304)
+
+            headers = {'ETag': etag} if self.config.etag else {}
+            return web.Response(body=body, content_type='application/json', headers=headers)
+
+        if endpoint == 'userinfo':
+            return web.json_response({'account_id': 'bench-account', 'email': 'bench@example.com'})
+
+        return web.json_response({
+            'access_token': 'bench-token',
+            'refresh_token': 'bench-refresh',
+            'token_type': 'Bearer',
+            'expires_in': 3600,
+        })
+
+
+async def start_fake_postnl(config: FakePostNLConfig) -> tuple[FakePostNL, web.AppRunner, str]:
+    """Start the fake server on a free local port, return it with its runner and base URL."""
+    fake = FakePostNL(config)
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    return fake, runner, f"http://127.0.0.1:{port}"
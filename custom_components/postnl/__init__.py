@@ -1,25 +1,40 @@
+import asyncio
 import logging
 import time
 
-import requests
-import urllib3
-from aiohttp.client_exceptions import ClientError, ClientResponseError
-from gql.transport.exceptions import TransportQueryError
+from aiohttp.client_exceptions import ClientError
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_ACCESS_TOKEN
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import (ConfigEntryNotReady, HomeAssistantError)
 from homeassistant.helpers import config_entry_oauth2_flow
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.config_entry_oauth2_flow import (
     OAuth2Session, async_get_config_entry_implementation)
 
-from .const import DOMAIN, PLATFORMS
+from .const import (CONF_USERINFO, CONFIG_ENTRY_VERSION, DOMAIN, PLATFORMS,
+                    TOKEN_REFRESH_COOLDOWN, TOKEN_VERIFIED_INTERVAL)
 from .graphql import PostNLGraphql
+from .http_client import PostNLHttpClient
+from .jouw_api import PostNLJouwAPI
 from .login_api import PostNLLoginAPI
+from .retry import CircuitOpenError
+from .services import async_setup_services
+from .snapshot import async_remove_snapshot
+from .stats import ENDPOINT_TOKEN_REFRESH
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Set up the PostNL services."""
+    async_setup_services(hass)
+
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> True:
     """Set up PostNL from config entry."""
@@ -29,40 +44,101 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> True:
 
     implementation = await async_get_config_entry_implementation(hass, entry)
     session = OAuth2Session(hass, entry, implementation)
-    auth = AsyncConfigEntryAuth(session)
+
+    http = PostNLHttpClient(hass, session.token[CONF_ACCESS_TOKEN])
+    entry.async_on_unload(http.async_close)
+
+    auth = AsyncConfigEntryAuth(session, http)
 
     try:
         await auth.check_and_refresh_token()
-    except requests.exceptions.ConnectionError as exception:
+    except HomeAssistantError as exception:
         raise ConfigEntryNotReady("Unable to retrieve oauth data from PostNL") from exception
 
     hass.data[DOMAIN][entry.entry_id] = {
-        'auth': auth
+        'auth': auth,
+        'http': http,
+        'graphql': PostNLGraphql(http),
+        'jouw_api': PostNLJouwAPI(http),
+        'options': dict(entry.options)
     }
 
     _LOGGER.debug('Using access token: %s', auth.access_token)
 
-    postnl_login_api = PostNLLoginAPI(auth.access_token)
+    userinfo = entry.data.get(CONF_USERINFO)
+    if userinfo:
+        entry.async_create_background_task(hass, async_refresh_userinfo(hass, entry, http), "postnl_userinfo")
+    else:
+        try:
+            userinfo = await async_fetch_userinfo(http)
+        except (ClientError, asyncio.TimeoutError, CircuitOpenError) as exception:
+            raise ConfigEntryNotReady("Unable to retrieve user information from PostNL.") from exception
 
-    try:
-        userinfo = await hass.async_add_executor_job(postnl_login_api.userinfo)
-    except (requests.exceptions.RequestException, urllib3.exceptions.MaxRetryError) as exception:
-        raise ConfigEntryNotReady("Unable to retrieve user information from PostNL.") from exception
+        if "error" in userinfo:
+            raise ConfigEntryNotReady("Error in retrieving user information from PostNL.")
 
-    if "error" in userinfo:
-        raise ConfigEntryNotReady("Error in retrieving user information from PostNL.")
+        hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_USERINFO: userinfo})
 
     hass.data[DOMAIN][entry.entry_id]['userinfo'] = userinfo
 
-    device_registry = dr.async_get(hass)
-    entity_registry = er.async_get(hass)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    return True
+
+
+async def async_fetch_userinfo(http: PostNLHttpClient) -> dict:
+    """Return the account id and email of the PostNL account, or the error PostNL returned."""
+    userinfo = await PostNLLoginAPI(http).userinfo()
+    if "error" in userinfo:
+        return userinfo
+
+    return {
+        'account_id': userinfo.get('account_id'),
+        'email': userinfo.get('email')
+    }
+
+
+async def async_refresh_userinfo(hass: HomeAssistant, entry: ConfigEntry, http: PostNLHttpClient) -> None:
+    """Refresh the cached userinfo of a config entry, keeping the cached one on failure."""
+    try:
+        userinfo = await async_fetch_userinfo(http)
+    except (ClientError, asyncio.TimeoutError, CircuitOpenError) as exception:
+        _LOGGER.debug('Unable to refresh PostNL user information, using the cached one: %s', exception)
+        return
+
+    cached = entry.data.get(CONF_USERINFO, {})
+    if "error" in userinfo or userinfo == cached:
+        return
+
+    _LOGGER.debug('PostNL user information changed')
+    hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_USERINFO: userinfo})
+
+    # Entities and the device are keyed on the account id, set them up again when it changed.
+    if userinfo.get('account_id') != cached.get('account_id'):
+        hass.config_entries.async_schedule_reload(entry.entry_id)
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a PostNL config entry to the current version."""
+    _LOGGER.debug("Migrating PostNL entry from version %s", entry.version)
 
-    for device_entry in dr.async_entries_for_config_entry(
-            device_registry, entry.entry_id
-    ):
-        if (
-                device_entry.identifiers == {(DOMAIN, userinfo.get('account_id'))}
+    if entry.version > CONFIG_ENTRY_VERSION:
+        return False
+
+    if entry.version == 1:
+        device_registry = dr.async_get(hass)
+        entity_registry = er.async_get(hass)
+
+        for device_entry in dr.async_entries_for_config_entry(
+                device_registry, entry.entry_id
         ):
+            account_id = next(
+                (identifier for domain, identifier in device_entry.identifiers if domain == DOMAIN), None)
+            if account_id is None:
+                continue
+
             _LOGGER.debug(
                 "Migrating entry %s", device_entry.identifiers
             )
@@ -70,22 +146,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> True:
                     entity_registry, device_entry.id, True
             ):
                 _LOGGER.debug('Migrating entity: %s', entity_entry.unique_id)
-                if entity_entry.unique_id.startswith(userinfo.get('account_id')):
+                if entity_entry.unique_id.startswith(account_id):
                     continue
 
                 unique_id_parts = entity_entry.unique_id.split("_")
-                entity_new_unique_id = userinfo.get('account_id') + "_" + (
+                entity_new_unique_id = account_id + "_" + (
                     unique_id_parts[1] if len(unique_id_parts) > 1 else unique_id_parts[0])
                 _LOGGER.debug('New unique ID for entity: %s', entity_new_unique_id)
                 entity_registry.async_update_entity(
                     entity_id=entity_entry.entity_id, new_unique_id=entity_new_unique_id
                 )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        hass.config_entries.async_update_entry(entry, version=2)
+
+    # Every version bump needs its own step above, an entry must never end up between versions.
+    if entry.version != CONFIG_ENTRY_VERSION:
+        _LOGGER.error("No migration of PostNL entry from version %s to %s", entry.version, CONFIG_ENTRY_VERSION)
+        return False
 
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the persisted snapshot of a PostNL config entry."""
+    await async_remove_snapshot(hass, entry.entry_id)
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload PostNL when the options change.
+
+    The listener also fires for token and userinfo updates of the entry data, those need no reload.
+    """
+    if entry.options == hass.data[DOMAIN][entry.entry_id]['options']:
+        return
+
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload PostNL config entry."""
     _LOGGER.debug('Reloading PostNL integration')
@@ -103,39 +200,97 @@ class AsyncConfigEntryAuth:
     def __init__(
             self,
             oauth2_session: config_entry_oauth2_flow.OAuth2Session,
+            http: PostNLHttpClient,
     ) -> None:
         """Initialize PostNL Auth."""
         self.oauth_session = oauth2_session
+        self.http = http
+        self.last_success: float | None = None
+        self.refreshed_at: float | None = None
+        self._refresh_task: asyncio.Task | None = None
 
     @property
     def access_token(self) -> str:
         """Return the access token."""
         return self.oauth_session.token[CONF_ACCESS_TOKEN]
 
+    def update_clients(self) -> None:
+        """Hand the current access token to the shared HTTP client."""
+        self.http.set_access_token(self.access_token)
+
+    @property
+    def token_recently_verified(self) -> bool:
+        """Return whether the current token was accepted by PostNL recently."""
+        return (
+                self.last_success is not None
+                and time.monotonic() - self.last_success < TOKEN_VERIFIED_INTERVAL.total_seconds()
+        )
+
+    def mark_token_verified(self) -> None:
+        """Record that PostNL accepted the current token."""
+        self.last_success = time.monotonic()
+
     async def force_refresh_expire(self):
+        """Expire the token so the next check refreshes it.
+
+        Does nothing while a refresh is in flight or right after one finished, so
+        concurrent callers that saw the same rejected token cause a single refresh.
+        """
+        if self._refresh_task is not None or (
+                self.refreshed_at is not None
+                and time.monotonic() - self.refreshed_at < TOKEN_REFRESH_COOLDOWN.total_seconds()
+        ):
+            _LOGGER.debug('Token refresh already in flight or just done')
+            return
+
         _LOGGER.debug('Force token refresh')
+        self.last_success = None
         self.oauth_session.token["expires_at"] = time.time() - 600
 
     async def check_and_refresh_token(self) -> str:
-        """Check the token."""
+        """Check the token locally and refresh it when it has expired.
 
-        try:
-            await self.oauth_session.async_ensure_token_valid()
-            graphql = PostNLGraphql(self.access_token)
-            await self.oauth_session.hass.async_add_executor_job(graphql.profile)
+        Concurrent callers share a single in-flight refresh.
+        """
+        if self.oauth_session.valid_token and self.token_recently_verified and self._refresh_task is None:
+            return self.access_token
 
-        except (ClientResponseError, ClientError) as exception:
+        if self._refresh_task is None:
+            self._refresh_task = self.oauth_session.config_entry.async_create_background_task(
+                self.oauth_session.hass, self._async_refresh_token(), "postnl_token_refresh")
+            self._refresh_task.add_done_callback(self._clear_refresh_task)
+        else:
+            _LOGGER.debug('Joining in-flight token refresh')
+
+        await asyncio.shield(self._refresh_task)
+
+        return self.access_token
+
+    def _clear_refresh_task(self, task: asyncio.Task) -> None:
+        self._refresh_task = None
+
+        if not task.cancelled():
+            task.exception()
+
+    async def _async_refresh_token(self) -> None:
+        was_valid = self.oauth_session.valid_token
+
+        try:
+            if was_valid:
+                await self.oauth_session.async_ensure_token_valid()
+            else:
+                with self.http.stats.measure(ENDPOINT_TOKEN_REFRESH):
+                    await self.oauth_session.async_ensure_token_valid()
+        except (ClientError, asyncio.TimeoutError) as exception:
             _LOGGER.debug("API error: %s", exception)
-            if exception.status == 400:
+            if getattr(exception, 'status', None) == 400:
                 self.oauth_session.config_entry.async_start_reauth(
                     self.oauth_session.hass
                 )
 
             raise HomeAssistantError(exception) from exception
-        except TransportQueryError as exception:
-            _LOGGER.debug("GraphQL error: %s", exception)
 
-            await self.force_refresh_expire()
-            await self.oauth_session.async_ensure_token_valid()
+        if not was_valid:
+            self.refreshed_at = time.monotonic()
 
-        return self.access_token
+        self.update_clients()
@@ -0,0 +1,85 @@
+"""Cache for PostNL track and trace details."""
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import (OVERDUE_PERIOD, STATUS_PHASE_ANNOUNCED,
+                    TRACK_AND_TRACE_CACHE_SIZE,
+                    TRACK_AND_TRACE_TTL_ANNOUNCED,
+                    TRACK_AND_TRACE_TTL_DELIVERY_DAY,
+                    TRACK_AND_TRACE_TTL_IN_TRANSIT)
+from .dates import parse_datetime
+from .structs.colli import Colli
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TrackAndTraceCache:
+    """LRU cache of track and trace details with a TTL based on the colli status."""
+
+    def __init__(self, max_size: int = TRACK_AND_TRACE_CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Colli]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Colli | None:
+        """Return the cached colli of a shipment, or None when missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, colli = entry
+        if time.monotonic() >= expires_at:
+            _LOGGER.debug('Track and trace cache expired for %s', key)
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+
+        return colli
+
+    def set(self, key: str, colli: Colli) -> None:
+        """Store the colli of a shipment, evicting the least recently used entry when full."""
+        ttl = self.ttl(colli)
+        _LOGGER.debug('Caching track and trace details for %s for %s', key, ttl)
+
+        self._entries[key] = (time.monotonic() + ttl.total_seconds(), colli)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        """Drop the cached details for a shipment."""
+        self._entries.pop(key, None)
+
+    @staticmethod
+    def ttl(colli: Colli, now: datetime | None = None) -> timedelta:
+        """Return how long colli details stay fresh.
+
+        Parcels with a delivery window today are refreshed on almost every poll,
+        parcels that are only announced or are days away are refreshed rarely. Once a
+        window is long past the parcel is treated as in transit again.
+        """
+        now = dt_util.as_local(now or dt_util.now())
+        window_start = parse_datetime(colli.planned_from)
+        window_end = parse_datetime(colli.planned_to) or window_start
+
+        if window_start is not None:
+            if window_end + OVERDUE_PERIOD < now:
+                return TRACK_AND_TRACE_TTL_IN_TRANSIT
+            if window_start.date() <= now.date():
+                return TRACK_AND_TRACE_TTL_DELIVERY_DAY
+            if window_start - now > timedelta(days=1):
+                return TRACK_AND_TRACE_TTL_ANNOUNCED
+
+        if colli.status_phase == STATUS_PHASE_ANNOUNCED:
+            return TRACK_AND_TRACE_TTL_ANNOUNCED
+
+        return TRACK_AND_TRACE_TTL_IN_TRANSIT
@@ -1,9 +1,18 @@
 import logging
 
-from homeassistant.config_entries import ConfigEntry
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry, OptionsFlow
+from homeassistant.core import callback
 from homeassistant.helpers import config_entry_oauth2_flow
 
-from .const import DOMAIN
+from .const import (CONF_DELIVERED_MAX_AGE, CONF_DELIVERED_MAX_COUNT,
+                    CONFIG_ENTRY_VERSION,
+                    CONF_MAX_CONCURRENT_REQUESTS, CONF_MAX_UPDATE_INTERVAL,
+                    CONF_MIN_UPDATE_INTERVAL, DEFAULT_DELIVERED_MAX_AGE,
+                    DEFAULT_DELIVERED_MAX_COUNT,
+                    DEFAULT_MAX_CONCURRENT_REQUESTS,
+                    DEFAULT_MAX_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL,
+                    DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -13,9 +22,16 @@ class OAuth2FlowHandler(
     """Config flow to handle OAuth2 authentication."""
 
     DOMAIN = DOMAIN
+    VERSION = CONFIG_ENTRY_VERSION
 
     reauth_entry: ConfigEntry | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow."""
+        return PostNLOptionsFlowHandler()
+
     @property
     def logger(self) -> logging.Logger:
         """Return logger."""
@@ -44,3 +60,46 @@ class OAuth2FlowHandler(
             return self.async_abort(reason="reauth_successful")
 
         return await super().async_oauth_create_entry(data)
+
+
+class PostNLOptionsFlowHandler(OptionsFlow):
+    """Options flow to tune the PostNL polling behaviour."""
+
+    async def async_step_init(self, user_input=None):
+        """Manage the polling options."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_UPDATE_INTERVAL] > user_input[CONF_MAX_UPDATE_INTERVAL]:
+                errors["base"] = "min_above_max"
+            else:
+                return self.async_create_entry(data={**self.config_entry.options, **user_input})
+
+        options = self.config_entry.options
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(
+                    CONF_MIN_UPDATE_INTERVAL,
+                    default=options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                vol.Required(
+                    CONF_MAX_UPDATE_INTERVAL,
+                    default=options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL)
+                ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                vol.Required(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=25)),
+                vol.Required(
+                    CONF_DELIVERED_MAX_COUNT,
+                    default=options.get(CONF_DELIVERED_MAX_COUNT, DEFAULT_DELIVERED_MAX_COUNT)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Required(
+                    CONF_DELIVERED_MAX_AGE,
+                    default=options.get(CONF_DELIVERED_MAX_AGE, DEFAULT_DELIVERED_MAX_AGE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            }),
+            errors=errors
+        )
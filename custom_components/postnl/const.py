@@ -1,12 +1,81 @@
+from datetime import timedelta
+
 from homeassistant.const import Platform
 
 DOMAIN = "postnl"
+CONFIG_ENTRY_VERSION = 2
 POSTNL_CLIENT_ID = "deb0a372-6d72-4e09-83fe-997beacbd137"
 POSTNL_AUTH_URL = "https://login.postnl.nl/101112a0-4a0f-4bbb-8176-2f1b2d370d7c/login/authorize"
 POSTNL_TOKEN_URL = "https://login.postnl.nl/101112a0-4a0f-4bbb-8176-2f1b2d370d7c/login/token"
 POSTNL_REDIRECT_URI = "postnl://login"
 POSTNL_SCOPE = "profile openid email address phone poa-profiles-api"
 
+CONF_USERINFO = "userinfo"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_DELIVERED_MAX_COUNT = "delivered_max_count"
+CONF_DELIVERED_MAX_AGE = "delivered_max_age"
+
+DEFAULT_MIN_UPDATE_INTERVAL = 90
+DEFAULT_MAX_UPDATE_INTERVAL = 1800
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
+DEFAULT_DELIVERED_MAX_COUNT = 25
+DEFAULT_DELIVERED_MAX_AGE = 30
+
+ACTIVE_WINDOW_MARGIN = timedelta(minutes=30)
+OVERDUE_PERIOD = timedelta(hours=4)
+UNPLANNED_UPDATE_INTERVAL = timedelta(minutes=15)
+NIGHT_START_HOUR = 22
+NIGHT_END_HOUR = 7
+
+DATA_CIRCUIT_BREAKERS = "circuit_breakers"
+DATA_SCHEDULER = "scheduler"
+DATA_SNAPSHOT_STORES = "snapshot_stores"
+
+UPDATE_STAGGER = timedelta(seconds=10)
+RATE_LIMIT_REQUESTS_PER_SECOND = 5.0
+RATE_LIMIT_BURST = 20
+
+HTTP_REQUEST_TIMEOUT = 60
+HTTP_LIMIT_PER_HOST = 10
+HTTP_KEEPALIVE_TIMEOUT = 120
+TRACK_AND_TRACE_DEADLINE = 30
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 10.0
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_RESET_TIMEOUT = timedelta(minutes=5)
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+
+TOKEN_VERIFIED_INTERVAL = timedelta(minutes=15)
+TOKEN_REFRESH_COOLDOWN = timedelta(seconds=30)
+
+STATUS_PHASE_ANNOUNCED = 1
+
+TRACK_AND_TRACE_CACHE_SIZE = 100
+TRACK_AND_TRACE_TTL_DELIVERY_DAY = timedelta(minutes=1)
+TRACK_AND_TRACE_TTL_IN_TRANSIT = timedelta(minutes=10)
+TRACK_AND_TRACE_TTL_ANNOUNCED = timedelta(hours=1)
+
+PACKAGE_MAX_STALENESS = timedelta(minutes=10)
+DELIVERED_REFRESH_INTERVAL = timedelta(hours=1)
+
+
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+
+EVENT_PACKAGE_ADDED = "postnl_package_added"
+EVENT_PACKAGE_STATUS_CHANGED = "postnl_package_status_changed"
+EVENT_PACKAGE_WINDOW_MOVED = "postnl_package_window_moved"
+EVENT_PACKAGE_DELIVERED = "postnl_package_delivered"
+EVENT_PACKAGE_REMOVED = "postnl_package_removed"
+
 
 PLATFORMS = [
     Platform.SENSOR
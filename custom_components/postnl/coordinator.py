@@ -1,23 +1,87 @@
 import asyncio
 import logging
+import time
+from dataclasses import replace
 from datetime import timedelta
+from http import HTTPStatus
+from typing import Any
 
-import requests
+from aiohttp import ClientError, ClientResponseError
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import (DataUpdateCoordinator,
                                                       UpdateFailed)
+from homeassistant.util import dt as dt_util
 
 from . import AsyncConfigEntryAuth, PostNLGraphql
-from .const import DOMAIN
+from .cache import TrackAndTraceCache
+from .const import (CONF_DELIVERED_MAX_AGE, CONF_DELIVERED_MAX_COUNT,
+                    CONF_MAX_CONCURRENT_REQUESTS, CONF_MAX_UPDATE_INTERVAL,
+                    CONF_MIN_UPDATE_INTERVAL, DEFAULT_DELIVERED_MAX_AGE,
+                    DEFAULT_DELIVERED_MAX_COUNT,
+                    DEFAULT_MAX_CONCURRENT_REQUESTS,
+                    DEFAULT_MAX_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL,
+                    DELIVERED_REFRESH_INTERVAL, DOMAIN, OVERDUE_PERIOD, PACKAGE_MAX_STALENESS,
+                    SNAPSHOT_SAVE_DELAY, TRACK_AND_TRACE_DEADLINE,
+                    TRACK_AND_TRACE_TTL_DELIVERY_DAY)
+from .dates import parse_datetime
+from .events import diff_packages
+from .exceptions import GraphqlError, GraphqlQueryError
 from .jouw_api import PostNLJouwAPI
+from .polling import calculate_update_interval
+from .retry import CircuitOpenError
+from .scheduler import async_get_scheduler
+from .snapshot import async_get_snapshot_store, deserialize, serialize
+from .stats import (PHASE_AUTH, PHASE_FAN_OUT, PHASE_SHIPMENTS,
+                    PostNLStatistics)
 from .structs.package import Package
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def shipment_fingerprint(shipment: dict) -> tuple:
+    """Return a hashable fingerprint of the GraphQL summary of a shipment."""
+    return tuple(sorted(shipment.items()))
+
+
+def apply_retention(shipments: list[dict], max_count: int, max_age: timedelta) -> list[dict]:
+    """Drop delivered shipments older than max_age and keep at most max_count of the newest ones."""
+    oldest = dt_util.utcnow() - max_age
+    delivered = []
+
+    for shipment in shipments:
+        if not shipment.get('delivered'):
+            continue
+
+        delivered_at = parse_datetime(shipment.get('deliveredTimeStamp'))
+        if delivered_at is not None and delivered_at < oldest:
+            continue
+
+        delivered.append((delivered_at, shipment))
+
+    delivered.sort(key=lambda item: item[0] or dt_util.utc_from_timestamp(0), reverse=True)
+    kept = {id(shipment) for _, shipment in delivered[:max_count]}
+
+    return [shipment for shipment in shipments if not shipment.get('delivered') or id(shipment) in kept]
+
+
+def max_staleness(package: Package) -> timedelta:
+    """Return how long an in-transit package may be reused while its GraphQL summary is unchanged."""
+    now = dt_util.now()
+    planned_from = parse_datetime(package.planned_from)
+    planned_to = parse_datetime(package.planned_to) or planned_from
+
+    if planned_from is not None and planned_from.date() <= now.date() and now <= planned_to + OVERDUE_PERIOD:
+        return TRACK_AND_TRACE_TTL_DELIVERY_DAY
+
+    return PACKAGE_MAX_STALENESS
+
+
 class PostNLCoordinator(DataUpdateCoordinator):
     data: dict[str, list[Package]]
     graphq_api: PostNLGraphql
     jouw_api: PostNLJouwAPI
+    track_and_trace_cache: TrackAndTraceCache
+    request_semaphore: asyncio.Semaphore
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize PostNL coordinator."""
@@ -25,99 +89,365 @@ class PostNLCoordinator(DataUpdateCoordinator):
             hass,
             _LOGGER,
             name="PostNL",
-            update_interval=timedelta(seconds=90),
+            update_interval=timedelta(seconds=DEFAULT_MIN_UPDATE_INTERVAL),
         )
+        self.track_and_trace_cache = TrackAndTraceCache()
+        self.previous_packages: dict[str, tuple[tuple, Package, float]] = {}
+        self.delivered_packages: dict[str, tuple[tuple, Package]] = {}
+        self.delivered_refreshed_at: float | None = None
+        self.update_task: asyncio.Task | None = None
+        # Kept here so a cycle that ends after the entry unloaded can still record itself.
+        self.stats: PostNLStatistics = hass.data[DOMAIN][self.config_entry.entry_id]['http'].stats
+        self.store = async_get_snapshot_store(hass, self.config_entry.entry_id)
+        self.snapshot_pending = False
         _LOGGER.debug("PostNLCoordinator initialized with update interval: %s", self.update_interval)
-        
+
+    @property
+    def min_update_interval(self) -> timedelta:
+        """Return the configured minimum update interval."""
+        return timedelta(
+            seconds=self.config_entry.options.get(CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL))
+
+    @property
+    def max_update_interval(self) -> timedelta:
+        """Return the configured maximum update interval."""
+        return timedelta(
+            seconds=self.config_entry.options.get(CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL))
+
+    @property
+    def max_concurrent_requests(self) -> int:
+        """Return the configured maximum of concurrent track and trace requests."""
+        return self.config_entry.options.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+
+    def retained(self, shipments: list[dict]) -> list[dict]:
+        """Apply the configured delivered history retention to a list of shipments."""
+        return apply_retention(
+            shipments,
+            self.config_entry.options.get(CONF_DELIVERED_MAX_COUNT, DEFAULT_DELIVERED_MAX_COUNT),
+            timedelta(days=self.config_entry.options.get(CONF_DELIVERED_MAX_AGE, DEFAULT_DELIVERED_MAX_AGE))
+        )
+
+    async def async_load_snapshot(self) -> bool:
+        """Load the data persisted by a previous run, return whether it was usable."""
+        snapshot = await self.store.async_load()
+        if not snapshot:
+            return False
+
+        data = deserialize(snapshot)
+        if data is None:
+            return False
+
+        _LOGGER.debug("Loaded PostNL snapshot: %d receiver packages, %d sender packages.", len(data['receiver']), len(data['sender']))
+        self.data = data
+
+        return True
+
     async def _async_update_data(self) -> dict[str, list[Package]]:
+        """Run an update cycle, concurrent refresh requests share the one in flight."""
+        if self.update_task is None:
+            # Tied to the config entry, so unloading it cancels the cycle behind the shield.
+            self.update_task = self.config_entry.async_create_background_task(
+                self.hass, self._async_update_cycle(), "postnl_update")
+            self.update_task.add_done_callback(self._clear_update_task)
+        else:
+            _LOGGER.debug("Joining in-flight PostNL data update.")
+
+        return await asyncio.shield(self.update_task)
+
+    def _clear_update_task(self, task: asyncio.Task) -> None:
+        self.update_task = None
+
+        # Callers get the result through the shield, mark it retrieved for when all of them were cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    async def async_run_cycle(self) -> dict[str, list[Package]]:
+        """Run a fresh update cycle through the single-flight path.
+
+        Waits for a cycle already in flight first, so the new cycle does not share its
+        statistics with one that started earlier.
+        """
+        if self.update_task is not None:
+            await asyncio.wait({self.update_task})
+
+        return await self._async_update_data()
+
+    async def _async_update_cycle(self) -> dict[str, list[Package]]:
+        await async_get_scheduler(self.hass).wait_for_slot()
+        return await self.async_fetch_data()
+
+    async def async_fetch_data(self) -> dict[str, list[Package]]:
+        start = time.monotonic()
+        success = False
+        self.stats.phases = {}
+
+        try:
+            data = await self._async_fetch_data()
+            success = True
+        finally:
+            self.stats.record_cycle(time.monotonic() - start, success)
+
+        return data
+
+    async def _async_fetch_data(self) -> dict[str, list[Package]]:
         _LOGGER.debug("Starting data update for PostNL.")
         try:
-            auth: AsyncConfigEntryAuth = self.hass.data[DOMAIN][self.config_entry.entry_id]['auth']
+            entry_data = self.hass.data[DOMAIN][self.config_entry.entry_id]
+            auth: AsyncConfigEntryAuth = entry_data['auth']
             _LOGGER.debug("Authenticating with PostNL API.")
-            await auth.check_and_refresh_token()
+            with self.stats.phase(PHASE_AUTH):
+                await auth.check_and_refresh_token()
 
-            self.graphq_api = PostNLGraphql(auth.access_token)
-            self.jouw_api = PostNLJouwAPI(auth.access_token)
+            self.graphq_api = entry_data['graphql']
+            self.jouw_api = entry_data['jouw_api']
+            self.request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
 
             data: dict[str, list[Package]] = {
                 'receiver': [],
                 'sender': []
             }
 
-            shipments = await self.hass.async_add_executor_job(self.graphq_api.shipments)
+            with self.stats.phase(PHASE_SHIPMENTS):
+                shipments = await self.fetch_shipments(auth)
 
             _LOGGER.debug("Shipments fetched: %s", shipments)
-            receiver_shipments = [self.transform_shipment(shipment) for shipment in
-                                  shipments.get('trackedShipments', {}).get('receiverShipments', [])]
-            data['receiver'] = await asyncio.gather(*receiver_shipments)
+            if (
+                    self.delivered_refreshed_at is None
+                    or time.monotonic() - self.delivered_refreshed_at > DELIVERED_REFRESH_INTERVAL.total_seconds()
+            ):
+                _LOGGER.debug("Refreshing delivered PostNL packages.")
+                self.delivered_packages.clear()
+                self.delivered_refreshed_at = time.monotonic()
+
+            with self.stats.phase(PHASE_FAN_OUT):
+                data['receiver'] = await self.build_packages(self.retained(
+                    shipments.get('trackedShipments', {}).get('receiverShipments', [])))
+                data['sender'] = await self.build_packages(self.retained(
+                    shipments.get('trackedShipments', {}).get('senderShipments', [])))
 
-            sender_shipments = [self.transform_shipment(shipment) for shipment in
-                                shipments.get('trackedShipments', {}).get('senderShipments', [])]
-            data['sender'] = await asyncio.gather(*sender_shipments)
+            packages = data['receiver'] + data['sender']
+            current_keys = {package.key for package in packages}
+            in_transit_keys = {package.key for package in packages if not package.delivered}
+            for key in self.previous_packages.keys() - in_transit_keys:
+                # Delivered or gone, its track and trace details are not looked up again.
+                del self.previous_packages[key]
+                self.track_and_trace_cache.invalidate(key)
+            for key in self.jouw_api.validators.keys() - in_transit_keys:
+                self.jouw_api.invalidate(key)
+            for key in self.delivered_packages.keys() - current_keys:
+                del self.delivered_packages[key]
 
             _LOGGER.info("Updated PostNL data: %d receiver packages, %d sender packages.", len(data['receiver']), len(data['sender']))
 
+            self.update_interval = calculate_update_interval(
+                packages,
+                self.min_update_interval,
+                self.max_update_interval
+            )
+            _LOGGER.debug("Next PostNL update in %s", self.update_interval)
+
+            if data != self.data:
+                self.snapshot_pending = True
+                self.store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+            self.fire_package_events(data)
+
             return data
-        except requests.exceptions.RequestException as exception:
+        except CircuitOpenError as exception:
+            _LOGGER.warning("Skipping PostNL data update: %s", exception)
+            self.update_interval = max(self.update_interval, timedelta(seconds=exception.retry_after))
+            raise UpdateFailed("PostNL is unavailable") from exception
+        except (ClientError, GraphqlError, asyncio.TimeoutError) as exception:
             _LOGGER.error("Network error during PostNL data update: %s", exception, exc_info=True)
             raise UpdateFailed("Unable to update PostNL data") from exception
 
-    async def transform_shipment(self, shipment) -> Package:
+    def _snapshot(self) -> dict:
+        self.snapshot_pending = False
+        return serialize(self.data)
+
+    async def async_flush_snapshot(self) -> None:
+        """Write a pending snapshot right away, called when the config entry unloads."""
+        if self.snapshot_pending:
+            await self.store.async_save(self._snapshot())
+
+    def fire_package_events(self, data: dict[str, list[Package]]) -> None:
+        """Fire a bus event per package change since the previous data.
+
+        Nothing is fired for the very first fetch without a snapshot, every package
+        would otherwise show up as added on each start.
+        """
+        if self.data is None:
+            return
+
+        for event_type, event_data in diff_packages(self.data, data):
+            _LOGGER.debug("Firing %s for %s", event_type, event_data['key'])
+            self.hass.bus.async_fire(event_type, {
+                'config_entry_id': self.config_entry.entry_id,
+                **event_data
+            })
+
+    async def fetch_shipments(self, auth: AsyncConfigEntryAuth) -> dict:
+        """Fetch the shipments, refreshing the token and retrying once when it is rejected."""
+        try:
+            shipments = await self.graphq_api.shipments()
+        except (GraphqlQueryError, ClientResponseError) as exception:
+            if isinstance(exception, ClientResponseError) and exception.status != HTTPStatus.UNAUTHORIZED:
+                raise
+
+            _LOGGER.debug("Shipments query rejected, refreshing token and retrying: %s", exception)
+            await auth.force_refresh_expire()
+            await auth.check_and_refresh_token()
+            shipments = await self.graphq_api.shipments()
+
+        auth.mark_token_verified()
+
+        return shipments
+
+    async def build_packages(self, shipments: list[dict]) -> list[Package]:
+        """Build the packages, only in-transit shipments go through the track and trace fan-out."""
+        in_transit = [self.refresh_shipment(shipment) for shipment in shipments if not shipment.get('delivered')]
+        refreshed = iter(await asyncio.gather(*in_transit))
+
+        return [
+            self.delivered_package(shipment) if shipment.get('delivered') else next(refreshed)
+            for shipment in shipments
+        ]
+
+    def delivered_package(self, shipment) -> Package:
+        """Return the materialized package of a delivered shipment.
+
+        It is rebuilt when the title or delivery time changed, everything else is picked
+        up by the hourly refresh of all delivered packages.
+        """
+        version = (shipment.get('title'), shipment.get('deliveredTimeStamp'))
+        previous = self.delivered_packages.get(shipment.get('key'))
+
+        if previous is not None and previous[0] == version:
+            return previous[1]
+
+        package = self.transform_delivered_shipment(shipment)
+        self.delivered_packages[shipment.get('key')] = (version, package)
+
+        return package
+
+    @staticmethod
+    def transform_delivered_shipment(shipment) -> Package:
+        return Package(
+            key=shipment.get('key'),
+            name=shipment.get('title'),
+            url=shipment.get('detailsUrl'),
+            shipment_type=shipment.get('shipmentType'),
+            status_message="Pakket is bezorgd",
+            delivered=shipment.get('delivered'),
+            delivery_date=shipment.get('deliveredTimeStamp'),
+            delivery_address_type=shipment.get('deliveryAddressType')
+        )
+
+    @staticmethod
+    def summary_fields(shipment) -> dict[str, Any]:
+        """Return the package fields that come from the GraphQL summary of a shipment."""
+        return {
+            'key': shipment.get('key'),
+            'name': shipment.get('title'),
+            'url': shipment.get('detailsUrl'),
+            'shipment_type': shipment.get('shipmentType'),
+            'delivered': shipment.get('delivered'),
+            'delivery_date': shipment.get('deliveredTimeStamp'),
+            'delivery_address_type': shipment.get('deliveryAddressType'),
+        }
+
+    async def refresh_shipment(self, shipment) -> Package:
+        """Return the package for a shipment, reusing the previous one when its summary is unchanged.
+
+        A failed lookup never fails the refresh, the last known or summary package is used instead.
+        """
+        fingerprint = shipment_fingerprint(shipment)
+        previous = self.previous_packages.get(shipment.get('key'))
+
+        unchanged = None
+
+        if previous is not None:
+            previous_fingerprint, package, updated_at = previous
+            if previous_fingerprint == fingerprint:
+                if time.monotonic() - updated_at < max_staleness(package).total_seconds():
+                    _LOGGER.debug('%s unchanged, reusing previous package.', shipment.get('key'))
+                    return package
+
+                unchanged = package
+
+        try:
+            package = await self.transform_shipment(shipment, unchanged)
+        except UpdateFailed:
+            if previous is not None:
+                # The summary is current, only the track and trace part is last known.
+                _LOGGER.warning('Keeping last known track and trace data for %s, marked as stale.', shipment.get('key'))
+                return replace(previous[1], **self.summary_fields(shipment), stale=True)
+
+            _LOGGER.warning('No previous data for %s, using the shipment summary.', shipment.get('key'))
+            return Package(
+                **self.summary_fields(shipment),
+                status_message="Unknown",
+                planned_date=shipment.get('deliveryWindowFrom'),
+                planned_from=shipment.get('deliveryWindowFrom'),
+                planned_to=shipment.get('deliveryWindowTo'),
+                stale=True
+            )
+
+        self.previous_packages[shipment.get('key')] = (fingerprint, package, time.monotonic())
+
+        return package
+
+    async def transform_shipment(self, shipment, unchanged: Package | None = None) -> Package:
+        """Build the package for a shipment.
+
+        unchanged is the previous package of a shipment with the same GraphQL summary,
+        it is returned as-is when the track and trace details did not change either.
+        """
         _LOGGER.debug('Updating %s', shipment.get('key'))
 
         try:
             if shipment.get('delivered'):
                 _LOGGER.debug('%s already delivered, no need to call jouw.postnl.', shipment.get('key'))
 
-                return Package(
-                    key=shipment.get('key'),
-                    name=shipment.get('title'),
-                    url=shipment.get('detailsUrl'),
-                    shipment_type=shipment.get('shipmentType'),
-                    status_message="Pakket is bezorgd",
-                    delivered=shipment.get('delivered'),
-                    delivery_date=shipment.get('deliveredTimeStamp'),
-                    delivery_address_type=shipment.get('deliveryAddressType')
-                )
-
-            _LOGGER.debug("Fetching Track and Trace details for shipment %s.", shipment['key'])
-            track_and_trace_details = await self.hass.async_add_executor_job(self.jouw_api.track_and_trace,
-                                                                             shipment['key'])
+                return self.transform_delivered_shipment(shipment)
 
-            if not track_and_trace_details.get('colli'):
-                _LOGGER.warning("No colli found for shipment %s. Details: %s", shipment['key'], track_and_trace_details)
+            colli = self.track_and_trace_cache.get(shipment['key'])
+            if colli is not None:
+                self.stats.cache_hits += 1
+            else:
+                self.stats.cache_misses += 1
+                _LOGGER.debug("Fetching Track and Trace details for shipment %s.", shipment['key'])
+                # The deadline covers all attempts of one lookup, so a single slow barcode
+                # cannot hold up the rest of the fan-out.
+                async with self.request_semaphore, asyncio.timeout(TRACK_AND_TRACE_DEADLINE):
+                    colli, changed = await self.jouw_api.track_and_trace(shipment['key'], shipment['barcode'])
+                self.track_and_trace_cache.set(shipment['key'], colli)
 
-            colli = track_and_trace_details.get('colli', {}).get(shipment['barcode'], {})
+                if not changed:
+                    self.stats.not_modified += 1
+                    if unchanged is not None:
+                        _LOGGER.debug('Track and trace for %s not modified, reusing previous package.', shipment['key'])
+                        return unchanged
 
             status_message = "Unknown"
 
-            if colli:
+            if not colli.found:
+                _LOGGER.warning("Barcode not found in colli details for shipment %s.", shipment['key'])
+
+            if colli.planned:
                 _LOGGER.debug("Colli details found for shipment %s: %s", shipment['key'], colli)
-                if colli.get("routeInformation"):
-                    route_information = colli.get("routeInformation")
-                    planned_date = route_information.get("plannedDeliveryTime")
-                    planned_from = route_information.get("plannedDeliveryTimeWindow", {}).get("startDateTime")
-                    planned_to = route_information.get("plannedDeliveryTimeWindow", {}).get('endDateTime')
-                    expected_datetime = route_information.get('expectedDeliveryTime')
-                elif colli.get('eta'):
-                    planned_date = colli.get('eta', {}).get('start')
-                    planned_from = colli.get('eta', {}).get('start')
-                    planned_to = colli.get('eta', {}).get('end')
-                    expected_datetime = None
-                else:
-                    planned_date = shipment.get('deliveryWindowFrom', None)
-                    planned_from = shipment.get('deliveryWindowFrom', None)
-                    planned_to = shipment.get('deliveryWindowTo', None)
-                    expected_datetime = None
-
-                status_message = colli.get('statusPhase', {}).get('message', "Unknown")
+                planned_date = colli.planned_date
+                planned_from = colli.planned_from
+                planned_to = colli.planned_to
+                expected_datetime = colli.expected_datetime
             else:
-                _LOGGER.warning("Barcode not found in colli details for shipment %s.", shipment['key'])
                 planned_date = shipment.get('deliveryWindowFrom', None)
                 planned_from = shipment.get('deliveryWindowFrom', None)
                 planned_to = shipment.get('deliveryWindowTo', None)
                 expected_datetime = None
 
+            if colli.found:
+                status_message = colli.status_message
+
             return Package(
                 key=shipment.get('key'),
                 name=shipment.get('title'),
@@ -132,6 +462,12 @@ class PostNLCoordinator(DataUpdateCoordinator):
                 planned_to=planned_to,
                 expected_datetime=expected_datetime
             )
-        except requests.exceptions.RequestException as exception:
+        except CircuitOpenError as exception:
+            _LOGGER.warning("Skipping Track and Trace details for shipment %s: %s", shipment.get('key'), exception)
+            raise UpdateFailed("PostNL track and trace is unavailable") from exception
+        except (ClientError, asyncio.TimeoutError) as exception:
             _LOGGER.error("Error fetching Track and Trace details for shipment %s: %s", shipment.get('key'), exception, exc_info=True)
             raise UpdateFailed("Unable to update PostNL data") from exception
+        except (KeyError, TypeError, ValueError) as exception:
+            _LOGGER.error("Malformed Track and Trace details for shipment %s: %s", shipment.get('key'), exception, exc_info=True)
+            raise UpdateFailed("Unable to parse PostNL data") from exception
@@ -0,0 +1,24 @@
+"""Timestamp parsing for the PostNL integration."""
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+
+def parse_datetime(value: str | None) -> datetime | None:
+    """Parse a PostNL timestamp into an aware local datetime.
+
+    PostNL mostly sends offsets, a timestamp without one is taken as local time so it
+    can always be compared with dt_util.now().
+    """
+    if not value:
+        return None
+
+    try:
+        parsed = dt_util.parse_datetime(value)
+    except ValueError:
+        return None
+
+    if parsed is None:
+        return None
+
+    return dt_util.as_local(parsed)
@@ -0,0 +1,37 @@
+"""Diagnostics support for PostNL."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_CIRCUIT_BREAKERS, DOMAIN
+from .scheduler import async_get_scheduler
+
+TO_REDACT = {"token", "access_token", "refresh_token", "id_token", "account_id", "email"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    breakers = hass.data[DOMAIN].get(DATA_CIRCUIT_BREAKERS, {})
+    scheduler = async_get_scheduler(hass)
+
+    return {
+        'entry': async_redact_data(entry.as_dict(), TO_REDACT),
+        'statistics': entry_data['http'].stats.as_dict(),
+        'circuit_breakers': {
+            host: {
+                'failures': breaker.failures,
+                'retry_after': breaker.retry_after,
+            }
+            for host, breaker in breakers.items()
+        },
+        'rate_limits': {
+            host: {
+                'tokens': bucket.tokens,
+                'capacity': bucket.capacity,
+            }
+            for host, bucket in scheduler.buckets.items()
+        },
+    }
@@ -0,0 +1,76 @@
+"""Per-package bus events derived from consecutive PostNL coordinator snapshots."""
+import logging
+from typing import Any
+
+from .const import (EVENT_PACKAGE_ADDED, EVENT_PACKAGE_DELIVERED,
+                    EVENT_PACKAGE_REMOVED, EVENT_PACKAGE_STATUS_CHANGED,
+                    EVENT_PACKAGE_WINDOW_MOVED)
+from .structs.package import Package
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _base(direction: str, package: Package) -> dict[str, Any]:
+    return {
+        'key': package.key,
+        'name': package.name,
+        'direction': direction,
+    }
+
+
+def diff_packages(
+        previous: dict[str, list[Package]],
+        current: dict[str, list[Package]]
+) -> list[tuple[str, dict[str, Any]]]:
+    """Return the (event type, event data) pairs describing what changed between two snapshots.
+
+    Packages are matched on key per direction (receiver or sender). A package that got
+    delivered only yields the delivered event, not a status change as well.
+    """
+    events = []
+
+    for direction, packages in current.items():
+        before = {package.key: package for package in previous.get(direction, [])}
+        after = {package.key: package for package in packages}
+
+        for key, package in after.items():
+            old = before.get(key)
+
+            if old is None:
+                events.append((EVENT_PACKAGE_ADDED, {
+                    **_base(direction, package),
+                    'status_message': package.status_message,
+                    'delivered': package.delivered,
+                    'planned_from': package.planned_from,
+                    'planned_to': package.planned_to,
+                }))
+                continue
+
+            if package.delivered and not old.delivered:
+                events.append((EVENT_PACKAGE_DELIVERED, {
+                    **_base(direction, package),
+                    'delivery_date': package.delivery_date,
+                    'delivery_address_type': package.delivery_address_type,
+                }))
+                continue
+
+            if package.status_message != old.status_message:
+                events.append((EVENT_PACKAGE_STATUS_CHANGED, {
+                    **_base(direction, package),
+                    'status_message': package.status_message,
+                    'old_status_message': old.status_message,
+                }))
+
+            if not package.delivered and (package.planned_from, package.planned_to) != (old.planned_from, old.planned_to):
+                events.append((EVENT_PACKAGE_WINDOW_MOVED, {
+                    **_base(direction, package),
+                    'planned_from': package.planned_from,
+                    'planned_to': package.planned_to,
+                    'old_planned_from': old.planned_from,
+                    'old_planned_to': old.planned_to,
+                }))
+
+        for key in before.keys() - after.keys():
+            events.append((EVENT_PACKAGE_REMOVED, _base(direction, before[key])))
+
+    return events
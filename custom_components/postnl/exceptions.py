@@ -0,0 +1,15 @@
+"""Errors raised by the PostNL GraphQL client."""
+
+
+class GraphqlError(Exception):
+    """Raised when the PostNL GraphQL API could not answer a query."""
+
+
+class GraphqlQueryError(GraphqlError):
+    """Raised when the PostNL GraphQL API answers a query with errors."""
+
+    def __init__(self, message: str, errors: list | None = None, data: dict | None = None) -> None:
+        super().__init__(message)
+        self.errors = errors
+        self.data = data
+
@@ -1,87 +1,87 @@
 import logging
 
-from gql import Client, gql
-from gql.transport.requests import RequestsHTTPTransport
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+
+from .exceptions import GraphqlError, GraphqlQueryError
+from .http_client import PostNLHttpClient
+from .stats import ENDPOINT_GRAPHQL_SHIPMENTS
 
 _LOGGER = logging.getLogger(__name__)
 
+SHIPMENTS_QUERY = """
+query {
+  trackedShipments {
+    receiverShipments {
+      ...shipment
+      __typename
+    }
+    senderShipments {
+      ...shipment
+      __typename
+    }
+    __typename
+  }
+}
+fragment shipment on TrackedShipmentResultType {
+  key
+  creationDateTime
+  title
+  barcode
+  delivered
+  deliveredTimeStamp
+  deliveryWindowFrom
+  deliveryWindowTo
+  deliveryWindowType
+  detailsUrl
+  shipmentType
+  deliveryAddressType
+  sourceAccountId
+  sourceDisplayName
+  __typename
+}
+"""
+
+# The request body is serialized once, the query never changes.
+SHIPMENTS_BODY = json_bytes({'query': SHIPMENTS_QUERY})
+
 
 class PostNLGraphql:
     endpoint: str = "https://jouw.postnl.nl/account/api/graphql"
-    client: Client
-
-    def __init__(self, access_token: str):
-        self.client = Client(transport=RequestsHTTPTransport(
-            url=self.endpoint,
-            verify=True,
-            retries=3,
-            timeout=60,
-            headers={
-                'Authorization': 'Bearer ' + access_token
-            }
-        ))
-
-    def call(self, query: str):
-        query = gql(query)
-
-        return self.client.execute(query)
-
-    def profile(self):
-        _LOGGER.debug('Fetching profile')
-        query = """
-            query {
-              profile {
-                ...ProfileData
-                __typename
-              }
-            }
-            
-            fragment ProfileData on Profile {
-              username
-              __typename
-            }
+
+    def __init__(self, http: PostNLHttpClient):
+        self.http = http
+
+    async def post(self, body: bytes, root: str) -> dict:
+        """Post a pre-serialized query without client-side validation and return only the root field.
+
+        GraphQL errors in the response are raised as GraphqlQueryError, a response that
+        is not a GraphQL result with the root field as GraphqlError.
         """
+        response = await self.http.post(self.endpoint, body)
 
-        result = self.call(query)
+        try:
+            payload = json_loads(response.body)
+        except ValueError as exception:
+            raise GraphqlError(f"Invalid JSON in the {root} response") from exception
 
-        return result
+        if not isinstance(payload, dict):
+            raise GraphqlError(f"Unexpected {root} response")
 
-    def shipments(self):
-        _LOGGER.debug('Fetching shipments')
+        if errors := payload.get('errors'):
+            errors = errors if isinstance(errors, list) else [errors]
+            raise GraphqlQueryError(str(errors[0]), errors=errors, data=payload.get('data'))
 
-        query = """
-        query {
-          trackedShipments {
-            receiverShipments {
-              ...shipment
-              __typename
-            }
-            senderShipments {
-              ...shipment
-              __typename
-            }
-            __typename
-          }
-        }
-        fragment shipment on TrackedShipmentResultType {
-          key
-          creationDateTime
-          title
-          barcode
-          delivered
-          deliveredTimeStamp
-          deliveryWindowFrom
-          deliveryWindowTo
-          deliveryWindowType
-          detailsUrl
-          shipmentType
-          deliveryAddressType
-          sourceAccountId
-          sourceDisplayName
-          __typename
-        }
-        """
+        data = payload.get('data')
+        if not isinstance(data, dict) or root not in data:
+            raise GraphqlError(f"No {root} in the response")
+
+        return {root: data[root]}
+
+    async def shipments(self):
+        _LOGGER.debug('Fetching shipments')
 
-        result = self.call(query)
+        with self.http.stats.measure(ENDPOINT_GRAPHQL_SHIPMENTS):
+            result = await self.post(SHIPMENTS_BODY, 'trackedShipments')
 
         return result
@@ -0,0 +1,132 @@
+"""HTTP layer shared by the PostNL API clients of a config entry."""
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, NamedTuple, TypeVar
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, hdrs
+from homeassistant.const import CONTENT_TYPE_JSON, EVENT_HOMEASSISTANT_CLOSE
+from multidict import CIMultiDictProxy
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.ssl import client_context
+from yarl import URL
+
+from .const import (HTTP_KEEPALIVE_TIMEOUT, HTTP_LIMIT_PER_HOST,
+                    HTTP_REQUEST_TIMEOUT)
+from .retry import CircuitBreaker, RetryPolicy, async_get_circuit_breaker
+from .scheduler import TokenBucket, async_get_scheduler
+from .stats import PostNLStatistics
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class HttpResponse(NamedTuple):
+    """Status, headers and raw body of a response."""
+
+    status: int
+    headers: CIMultiDictProxy[str]
+    body: bytes
+
+
+class PostNLHttpClient:
+    """One keep-alive connection pool per host plus the bearer token, retries and circuit breakers."""
+
+    timeout: ClientTimeout = ClientTimeout(total=HTTP_REQUEST_TIMEOUT)
+    retry_policy: RetryPolicy = RetryPolicy()
+
+    def __init__(self, hass: HomeAssistant, access_token: str) -> None:
+        """Initialize the HTTP client."""
+        self.hass = hass
+        # Keep idle connections around for longer than the minimum update interval,
+        # so consecutive refreshes reuse warm TLS sessions to jouw.postnl.nl.
+        self.connector = TCPConnector(
+            ssl=client_context(),
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True
+        )
+        self.session = ClientSession(connector=self.connector, headers={hdrs.USER_AGENT: SERVER_SOFTWARE})
+        self.headers: dict[str, str] = {}
+        self.stats = PostNLStatistics()
+        self.set_access_token(access_token)
+        # Config entries are not unloaded when Home Assistant stops, close the session then as well.
+        self._unsub_close = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_on_stop)
+
+    def set_access_token(self, access_token: str) -> None:
+        """Swap the bearer token used by all requests."""
+        self.headers = {
+            "Authorization": "Bearer " + access_token
+        }
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker for the host of an URL."""
+        return async_get_circuit_breaker(self.hass, URL(url).host)
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Return the request budget shared by all config entries for the host of an URL."""
+        return async_get_scheduler(self.hass).bucket(URL(url).host)
+
+    async def call(self, url: str, func: Callable[..., Awaitable[_T]], *args: Any) -> _T:
+        """Call func through the retry policy, circuit breaker and request budget of the host of url."""
+        return await self.retry_policy.call(
+            self.breaker(url), self._rate_limited, self.bucket(url), func, *args, on_retry=self.stats.record_retry)
+
+    @staticmethod
+    async def _rate_limited(bucket: TokenBucket, func: Callable[..., Awaitable[_T]], *args: Any) -> _T:
+        await bucket.acquire()
+        return await func(*args)
+
+    async def get_json(self, url: str) -> Any:
+        """GET an URL and decode the JSON response, retrying transient failures."""
+        return await self.call(url, self._get_json, url)
+
+    async def _get_json(self, url: str) -> Any:
+        async with self.session.get(
+                url,
+                headers=self.headers,
+                timeout=self.timeout,
+                raise_for_status=True
+        ) as response:
+            return await response.json()
+
+    async def get(self, url: str, headers: dict[str, str] | None = None) -> HttpResponse:
+        """GET an URL with extra headers and return the raw response, retrying transient failures."""
+        return await self.call(url, self._get, url, headers or {})
+
+    async def _get(self, url: str, headers: dict[str, str]) -> HttpResponse:
+        async with self.session.get(
+                url,
+                headers={**self.headers, **headers},
+                timeout=self.timeout,
+                raise_for_status=True
+        ) as response:
+            return HttpResponse(response.status, response.headers, await response.read())
+
+    async def post(self, url: str, body: bytes) -> HttpResponse:
+        """POST a pre-serialized JSON body and return the raw response, retrying transient failures."""
+        return await self.call(url, self._post, url, body)
+
+    async def _post(self, url: str, body: bytes) -> HttpResponse:
+        async with self.session.post(
+                url,
+                data=body,
+                headers={**self.headers, hdrs.CONTENT_TYPE: CONTENT_TYPE_JSON},
+                timeout=self.timeout,
+                raise_for_status=True
+        ) as response:
+            return HttpResponse(response.status, response.headers, await response.read())
+
+    async def _async_close_on_stop(self, _event: Event) -> None:
+        self._unsub_close = None
+        await self.async_close()
+
+    async def async_close(self) -> None:
+        """Close the session and its connection pool."""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+
+        _LOGGER.debug('Closing PostNL HTTP client')
+        await self.session.close()
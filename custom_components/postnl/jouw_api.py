@@ -1,33 +1,84 @@
+import hashlib
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3 import Retry
+from aiohttp import hdrs
+from homeassistant.util.json import json_loads
+
+from .const import TRACK_AND_TRACE_CACHE_SIZE
+from .http_client import PostNLHttpClient
+from .stats import ENDPOINT_TRACK_AND_TRACE
+from .structs.colli import Colli
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class _Validators:
+    etag: str | None
+    last_modified: str | None
+    body_hash: bytes
+    colli: Colli
+
+
 class PostNLJouwAPI:
     base_url: str = "https://jouw.postnl.nl/track-and-trace/"
 
-    def __init__(self, access_token: str):
-        self.client = requests.Session()
-        self.client.mount(
-            prefix='https://',
-            adapter=HTTPAdapter(
-                max_retries=Retry(
-                    total=5,
-                    backoff_factor=3
-                ),
-                pool_maxsize=25,
-                pool_block=True
-            )
+    def __init__(self, http: PostNLHttpClient, max_validators: int = TRACK_AND_TRACE_CACHE_SIZE):
+        self.http = http
+        self.max_validators = max_validators
+        self.validators: OrderedDict[str, _Validators] = OrderedDict()
+
+    def invalidate(self, key: str) -> None:
+        """Forget the validators and colli of a shipment."""
+        self.validators.pop(key, None)
+
+    async def track_and_trace(self, key, barcode) -> tuple[Colli, bool]:
+        """Return the colli of a barcode and whether it changed since the previous lookup.
+
+        The response is projected down to a Colli right away, the full document is not kept.
+
+        Sends If-None-Match/If-Modified-Since when PostNL handed out validators, and
+        falls back to comparing a hash of the body when it did not.
+        """
+        previous = self.validators.get(key)
+        headers = {}
+
+        if previous is not None:
+            if previous.etag:
+                headers[hdrs.IF_NONE_MATCH] = previous.etag
+            if previous.last_modified:
+                headers[hdrs.IF_MODIFIED_SINCE] = previous.last_modified
+
+        with self.http.stats.measure(ENDPOINT_TRACK_AND_TRACE):
+            response = await self.http.get(self.base_url + "/api/trackAndTrace/" + key + "?language=nl", headers)
+
+        if previous is not None and response.status == HTTPStatus.NOT_MODIFIED:
+            _LOGGER.debug('Track and trace for %s not modified', key)
+            self.validators.move_to_end(key)
+            return previous.colli, False
+
+        body_hash = hashlib.blake2b(response.body, digest_size=16).digest()
+
+        if previous is not None and previous.body_hash == body_hash:
+            _LOGGER.debug('Track and trace for %s has an unchanged body', key)
+            colli = previous.colli
+            changed = False
+        else:
+            colli = Colli.from_details(json_loads(response.body), barcode)
+            changed = True
+
+        self.validators[key] = _Validators(
+            etag=response.headers.get(hdrs.ETAG),
+            last_modified=response.headers.get(hdrs.LAST_MODIFIED),
+            body_hash=body_hash,
+            colli=colli
         )
-        self.client.headers = {
-            "Authorization": "Bearer " + access_token
-        }
+        self.validators.move_to_end(key)
 
-    def track_and_trace(self, key):
-        response = self.client.get(self.base_url + "/api/trackAndTrace/" + key + "?language=nl")
+        while len(self.validators) > self.max_validators:
+            self.validators.popitem(last=False)
 
-        return response.json()
+        return colli, changed
@@ -1,8 +1,7 @@
 import logging
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3 import Retry
+from .http_client import PostNLHttpClient
+from .stats import ENDPOINT_USERINFO
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -10,22 +9,9 @@ _LOGGER = logging.getLogger(__name__)
 class PostNLLoginAPI:
     base_url: str = "https://login.postnl.nl/101112a0-4a0f-4bbb-8176-2f1b2d370d7c/"
 
-    def __init__(self, access_token: str):
-        self.client = requests.Session()
-        self.client.mount(
-            prefix='https://',
-            adapter=HTTPAdapter(
-                max_retries=Retry(
-                    total=5,
-                    backoff_factor=3
-                )
-            )
-        )
-        self.client.headers = {
-            "Authorization": "Bearer " + access_token
-        }
+    def __init__(self, http: PostNLHttpClient):
+        self.http = http
 
-    def userinfo(self):
-        response = self.client.get(self.base_url + "/profiles/oidc/userinfo")
-
-        return response.json()
+    async def userinfo(self):
+        with self.http.stats.measure(ENDPOINT_USERINFO):
+            return await self.http.get_json(self.base_url + "/profiles/oidc/userinfo")
@@ -0,0 +1,62 @@
+"""Adaptive polling interval for the PostNL coordinator."""
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import (ACTIVE_WINDOW_MARGIN, NIGHT_END_HOUR, NIGHT_START_HOUR,
+                    OVERDUE_PERIOD, UNPLANNED_UPDATE_INTERVAL)
+from .dates import parse_datetime
+from .structs.package import Package
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def calculate_update_interval(
+        packages: Iterable[Package],
+        min_interval: timedelta,
+        max_interval: timedelta,
+        now: datetime | None = None
+) -> timedelta:
+    """Return the next update interval based on the delivery windows of the packages.
+
+    Polls at the minimum interval inside an active delivery window and for a few hours
+    after a window passed without a delivery, backs off as the next window gets further
+    away and uses the maximum interval at night or when nothing is en route.
+    """
+    now = dt_util.as_local(now or dt_util.now())
+    interval = max_interval
+
+    for package in packages:
+        if package.delivered:
+            continue
+
+        planned_from = parse_datetime(package.planned_from)
+        planned_to = parse_datetime(package.planned_to) or planned_from
+        expected = parse_datetime(package.expected_datetime)
+
+        if expected is not None and abs(expected - now) <= ACTIVE_WINDOW_MARGIN:
+            return min_interval
+
+        if planned_from is None:
+            interval = min(interval, UNPLANNED_UPDATE_INTERVAL)
+            continue
+
+        if planned_from - ACTIVE_WINDOW_MARGIN <= now <= planned_to + ACTIVE_WINDOW_MARGIN:
+            return min_interval
+
+        if planned_to + ACTIVE_WINDOW_MARGIN < now:
+            # A late package may arrive at any moment, but a shipment that is never marked
+            # delivered must not keep polling at the minimum interval.
+            overdue = now <= planned_to + OVERDUE_PERIOD
+            interval = min(interval, min_interval if overdue else UNPLANNED_UPDATE_INTERVAL)
+            continue
+
+        if planned_from > now:
+            interval = min(interval, (planned_from - ACTIVE_WINDOW_MARGIN - now) / 4)
+
+    if now.hour >= NIGHT_START_HOUR or now.hour < NIGHT_END_HOUR:
+        interval = max_interval
+
+    return max(min_interval, min(interval, max_interval))
@@ -0,0 +1,151 @@
+"""Retry policy and circuit breaker for the PostNL endpoints."""
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Any, TypeVar
+
+from aiohttp import ClientConnectionError, ClientResponseError
+from homeassistant.core import HomeAssistant
+
+from .const import (CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                    CIRCUIT_BREAKER_RESET_TIMEOUT, DATA_CIRCUIT_BREAKERS,
+                    DOMAIN, RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when calls to a host are skipped because its circuit is open."""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"Circuit for {host} is open, retry after {retry_after:.0f} seconds")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def is_retryable(exception: BaseException) -> bool:
+    """Return whether an exception points at a transient problem on the PostNL side."""
+    if isinstance(exception, ClientResponseError):
+        return exception.status >= 500 or exception.status == 429
+
+    return isinstance(exception, (ClientConnectionError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """Skip calls to a host after repeated transient failures."""
+
+    def __init__(
+            self,
+            host: str,
+            failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout: timedelta = CIRCUIT_BREAKER_RESET_TIMEOUT
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def retry_after(self) -> float:
+        """Return the seconds until calls are let through again."""
+        if self.opened_at is None:
+            return 0
+
+        return max(0.0, self.opened_at + self.reset_timeout.total_seconds() - time.monotonic())
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError while the circuit is open.
+
+        Once the reset timeout has passed calls are let through again, a single
+        failure then reopens the circuit.
+        """
+        retry_after = self.retry_after
+        if retry_after > 0:
+            raise CircuitOpenError(self.host, retry_after)
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        if self.opened_at is not None:
+            _LOGGER.info('Circuit for %s closed', self.host)
+
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a transient failure and open the circuit when the threshold is reached."""
+        self.failures += 1
+
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                _LOGGER.warning('Circuit for %s opened after %d failures', self.host, self.failures)
+            self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter."""
+
+    def __init__(
+            self,
+            attempts: int = RETRY_ATTEMPTS,
+            base_delay: float = RETRY_BASE_DELAY,
+            max_delay: float = RETRY_MAX_DELAY
+    ) -> None:
+        """Initialize the retry policy."""
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Return the delay before the next attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(
+            self,
+            breaker: CircuitBreaker,
+            func: Callable[..., Awaitable[_T]],
+            *args: Any,
+            on_retry: Callable[[], None] | None = None
+    ) -> _T:
+        """Call func, retrying transient failures and reporting them to the breaker."""
+        for attempt in range(self.attempts):
+            breaker.before_call()
+
+            try:
+                result = await func(*args)
+            except Exception as exception:
+                if not is_retryable(exception):
+                    raise
+
+                breaker.record_failure()
+
+                if attempt + 1 >= self.attempts:
+                    raise
+
+                if on_retry is not None:
+                    on_retry()
+
+                delay = self.delay(attempt)
+                _LOGGER.debug('Request to %s failed (%s), retrying in %.1f seconds', breaker.host, exception, delay)
+                await asyncio.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
+
+        raise RuntimeError("Retry policy needs at least one attempt")
+
+
+def async_get_circuit_breaker(hass: HomeAssistant, host: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by all config entries for a host."""
+    breakers: dict[str, CircuitBreaker] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_CIRCUIT_BREAKERS, {})
+
+    if host not in breakers:
+        breakers[host] = CircuitBreaker(host)
+
+    return breakers[host]
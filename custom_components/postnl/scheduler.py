@@ -0,0 +1,99 @@
+"""Update cycle staggering and request rate limiting shared by all PostNL accounts."""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+
+from .const import (DATA_SCHEDULER, DOMAIN, RATE_LIMIT_BURST,
+                    RATE_LIMIT_REQUESTS_PER_SECOND, UPDATE_STAGGER)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allow bursts of requests to a host while capping the sustained rate."""
+
+    def __init__(
+            self,
+            host: str,
+            rate: float = RATE_LIMIT_REQUESTS_PER_SECOND,
+            capacity: int = RATE_LIMIT_BURST
+    ) -> None:
+        """Initialize the token bucket."""
+        self.host = host
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a request to the host fits in the budget and take a token.
+
+        Waiters are served in order, so a burst from one account cannot starve the others.
+        """
+        async with self._lock:
+            self._refill()
+
+            if self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                _LOGGER.debug('Request budget for %s used up, waiting %.2f seconds', self.host, delay)
+                await asyncio.sleep(delay)
+                self._refill()
+
+            self.tokens -= 1
+
+
+class PostNLScheduler:
+    """Spread the update cycles of all config entries and rate limit requests per host."""
+
+    def __init__(
+            self,
+            stagger: timedelta = UPDATE_STAGGER,
+            rate: float = RATE_LIMIT_REQUESTS_PER_SECOND,
+            burst: int = RATE_LIMIT_BURST
+    ) -> None:
+        """Initialize the scheduler."""
+        self.stagger = stagger
+        self.rate = rate
+        self.burst = burst
+        self.buckets: dict[str, TokenBucket] = {}
+        self.next_slot = 0.0
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Return the token bucket of a host."""
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(host, self.rate, self.burst)
+
+        return self.buckets[host]
+
+    async def wait_for_slot(self) -> None:
+        """Wait until at least the stagger has passed since the previous update cycle started.
+
+        Entries whose timers fire together are pushed apart, so adding an account adds
+        a cycle a few seconds later instead of doubling the size of every burst.
+        """
+        now = time.monotonic()
+        start = max(now, self.next_slot)
+        self.next_slot = start + self.stagger.total_seconds()
+
+        if start > now:
+            _LOGGER.debug('Staggering PostNL update cycle by %.1f seconds', start - now)
+            await asyncio.sleep(start - now)
+
+
+def async_get_scheduler(hass: HomeAssistant) -> PostNLScheduler:
+    """Return the scheduler shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if DATA_SCHEDULER not in domain_data:
+        domain_data[DATA_SCHEDULER] = PostNLScheduler()
+
+    return domain_data[DATA_SCHEDULER]
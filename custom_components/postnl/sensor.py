@@ -1,27 +1,97 @@
 """Sensor for PostNL packages."""
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
 
+from homeassistant.components.sensor import (SensorDeviceClass, SensorEntity,
+                                             SensorEntityDescription,
+                                             SensorStateClass)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
 
 from . import DOMAIN
 from .coordinator import PostNLCoordinator
+from .stats import ENDPOINTS, PostNLStatistics
 from .structs.package import Package
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class PostNLStatisticsSensorEntityDescription(SensorEntityDescription):
+    value_fn: Callable[[PostNLStatistics], StateType]
+    attributes_fn: Callable[[PostNLStatistics], dict[str, Any]] | None = None
+
+
+def _latency_description(endpoint: str) -> PostNLStatisticsSensorEntityDescription:
+    return PostNLStatisticsSensorEntityDescription(
+        key=f"{endpoint}_latency",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda stats: stats.latencies[endpoint].mean,
+        attributes_fn=lambda stats: stats.latencies[endpoint].as_dict(),
+    )
+
+
+STATISTICS_SENSORS: tuple[PostNLStatisticsSensorEntityDescription, ...] = (
+    PostNLStatisticsSensorEntityDescription(
+        key="refresh_duration",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda stats: stats.last_cycle_duration,
+        attributes_fn=lambda stats: {
+            **stats.cycle_duration.as_dict(),
+            'cycles': stats.cycles,
+            'failed_cycles': stats.failed_cycles,
+        },
+    ),
+    PostNLStatisticsSensorEntityDescription(
+        key="requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: sum(stats.requests.values()),
+        attributes_fn=lambda stats: {'requests': dict(stats.requests), 'errors': dict(stats.errors)},
+    ),
+    PostNLStatisticsSensorEntityDescription(
+        key="retries",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda stats: stats.retries,
+    ),
+    PostNLStatisticsSensorEntityDescription(
+        key="cache_hit_rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda stats: stats.cache_hit_rate,
+        attributes_fn=lambda stats: {
+            'cache_hits': stats.cache_hits,
+            'cache_misses': stats.cache_misses,
+            'not_modified': stats.not_modified,
+        },
+    ),
+    *(_latency_description(endpoint) for endpoint in ENDPOINTS),
+)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Set up the PostNL sensor platform."""
     _LOGGER.debug("Setting up PostNL sensors")
 
     coordinator = PostNLCoordinator(hass)
-    await coordinator.async_config_entry_first_refresh()
-    
+    hass.data[DOMAIN][entry.entry_id]['coordinator'] = coordinator
+    entry.async_on_unload(coordinator.async_flush_snapshot)
+    snapshot_loaded = await coordinator.async_load_snapshot()
+    if not snapshot_loaded:
+        await coordinator.async_config_entry_first_refresh()
+
     userinfo = hass.data[DOMAIN][entry.entry_id].get("userinfo", {})
     if not userinfo:
         _LOGGER.error("No userinfo found for PostNL entry")
@@ -42,11 +112,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             name="PostNL_distribution",
             unique_id=userinfo.get('account_id') + "_" + "distribution",
             receiver=False
+        ),
+        *(
+            PostNLStatisticsSensor(
+                coordinator=coordinator,
+                postnl_userinfo=userinfo,
+                description=description
+            )
+            for description in STATISTICS_SENSORS
         )
     ])
     _LOGGER.debug("PostNL sensors added")
 
+    if snapshot_loaded:
+        entry.async_create_background_task(hass, coordinator.async_refresh(), "postnl_refresh")
+
 class PostNLDelivery(CoordinatorEntity, Entity):
+    _unrecorded_attributes = frozenset({'enroute', 'delivered'})
+
     def __init__(self, coordinator, postnl_userinfo, unique_id, name, receiver: bool = True):
         """Initialize the PostNL sensor."""
         super().__init__(coordinator, context=name)
@@ -58,6 +141,8 @@ class PostNLDelivery(CoordinatorEntity, Entity):
             'delivered': [],
         }
         self._state = None
+        self._packages: tuple[Package, ...] = ()
+        self._available: bool | None = None
         self.receiver: bool = receiver
         self.handle_coordinator_data()
 
@@ -104,25 +189,79 @@ class PostNLDelivery(CoordinatorEntity, Entity):
 
     @callback
     def _handle_coordinator_update(self) -> None:
+        if self.coordinator_packages() == self._packages and self.available == self._available:
+            _LOGGER.debug('Sensor %s unchanged, skipping state write', self.name)
+            return
+
         _LOGGER.debug('Updating sensor %s', self.name)
 
         self.handle_coordinator_data()
 
         self.async_write_ha_state()
 
+    def coordinator_packages(self) -> tuple[Package, ...]:
+        if self.receiver:
+            return tuple(self.coordinator.data['receiver'])
+
+        return tuple(self.coordinator.data['sender'])
+
     def handle_coordinator_data(self):
         self._attributes['delivered'] = []
         self._attributes['enroute'] = []
 
-        if self.receiver:
-            coordinator_data = self.coordinator.data['receiver']
-        else:
-            coordinator_data = self.coordinator.data['sender']
+        coordinator_data = self.coordinator_packages()
+        self._packages = coordinator_data
+        self._available = self.available
 
         for package in coordinator_data:
             if package.delivered:
-                self._attributes['delivered'].append(vars(package))
+                self._attributes['delivered'].append(package.as_dict())
             else:
-                self._attributes['enroute'].append(vars(package))
+                self._attributes['enroute'].append(package.as_dict())
 
         self._state = len(self._attributes['enroute'])
+
+
+class PostNLStatisticsSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor exposing the performance statistics of the integration."""
+
+    entity_description: PostNLStatisticsSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, postnl_userinfo, description: PostNLStatisticsSensorEntityDescription):
+        """Initialize the PostNL statistics sensor."""
+        super().__init__(coordinator, context=description.key)
+        self.entity_description = description
+        self.postnl_userinfo = postnl_userinfo
+        self._attr_unique_id = postnl_userinfo.get('account_id') + "_" + description.key
+        self._attr_name = "PostNL_" + description.key
+
+    @property
+    def available(self) -> bool:
+        """Statistics are available even when the last update failed."""
+        return True
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            identifiers={
+                (DOMAIN, self.postnl_userinfo.get('account_id'))
+            },
+            name=self.postnl_userinfo.get('email'),
+            manufacturer="PostNL",
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the current value of the statistic."""
+        return self.entity_description.value_fn(self.coordinator.stats)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the details of the statistic."""
+        if self.entity_description.attributes_fn is None:
+            return None
+
+        return self.entity_description.attributes_fn(self.coordinator.stats)
@@ -0,0 +1,104 @@
+"""Services of the PostNL integration."""
+import cProfile
+import io
+import json
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SERVICE_PROFILE_REFRESH
+from .stats import PHASE_SENSOR_RENDERING
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+PROFILE_REFRESH_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+})
+
+
+def _write_profile(profiler: cProfile.Profile, path: str, report: dict[str, Any]) -> None:
+    # Only needed when the service runs, keep it off the startup import path.
+    import pstats
+
+    profiler.dump_stats(path + ".prof")
+
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+
+    with open(path + ".txt", "w", encoding="utf-8") as file:
+        file.write(summary.getvalue())
+
+    with open(path + ".json", "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+
+async def _async_profile_entry(hass: HomeAssistant, entry_id: str) -> str:
+    coordinator = hass.data[DOMAIN][entry_id]['coordinator']
+    profiler = cProfile.Profile()
+    started_at = dt_util.utcnow()
+
+    try:
+        profiler.enable()
+    except ValueError as exception:
+        raise HomeAssistantError(f"Unable to start the profiler: {exception}") from exception
+
+    try:
+        data = await coordinator.async_run_cycle()
+        # Copied right away, the next cycle resets them.
+        phases = dict(coordinator.stats.phases)
+        duration = coordinator.stats.last_cycle_duration
+
+        render_start = time.monotonic()
+        coordinator.async_set_updated_data(data)
+        render_duration = time.monotonic() - render_start
+    except UpdateFailed as exception:
+        raise HomeAssistantError(f"PostNL refresh failed: {exception}") from exception
+    finally:
+        profiler.disable()
+
+    report = {
+        'config_entry_id': entry_id,
+        'started_at': started_at.isoformat(),
+        'total': duration,
+        'phases': {**phases, PHASE_SENSOR_RENDERING: render_duration},
+        'packages': {group: len(packages) for group, packages in data.items()},
+    }
+
+    path = hass.config.path(f"postnl_profile_{entry_id}_{int(time.time())}")
+    await hass.async_add_executor_job(_write_profile, profiler, path, report)
+    _LOGGER.info("PostNL refresh profile written to %s.prof, %s.txt and %s.json", path, path, path)
+
+    return path
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the PostNL services."""
+
+    async def async_profile_refresh(call: ServiceCall) -> None:
+        """Run one coordinator refresh under cProfile and write the results to the config directory."""
+        entries = {
+            entry_id: entry_data
+            for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+            if isinstance(entry_data, dict) and 'coordinator' in entry_data
+        }
+
+        if ATTR_CONFIG_ENTRY_ID in call.data:
+            if call.data[ATTR_CONFIG_ENTRY_ID] not in entries:
+                raise HomeAssistantError(f"No loaded PostNL entry {call.data[ATTR_CONFIG_ENTRY_ID]}")
+            entries = {call.data[ATTR_CONFIG_ENTRY_ID]: entries[call.data[ATTR_CONFIG_ENTRY_ID]]}
+
+        for entry_id in entries:
+            await _async_profile_entry(hass, entry_id)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE_REFRESH, async_profile_refresh, schema=PROFILE_REFRESH_SCHEMA
+    )
@@ -0,0 +1,57 @@
+"""Persisted snapshot of the PostNL coordinator data."""
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_SNAPSHOT_STORES, DOMAIN, SNAPSHOT_STORAGE_VERSION
+from .structs.package import Package
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def async_get_snapshot_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store holding the snapshot of a config entry.
+
+    The store outlives reloads of the entry, so removing the entry can cancel a save
+    that is still pending.
+    """
+    stores: dict[str, Store] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_SNAPSHOT_STORES, {})
+
+    if entry_id not in stores:
+        stores[entry_id] = Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+    return stores[entry_id]
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    """Cancel a pending save of the snapshot of a config entry and remove its file."""
+    store = async_get_snapshot_store(hass, entry_id)
+    hass.data[DOMAIN][DATA_SNAPSHOT_STORES].pop(entry_id)
+
+    await store.async_remove()
+
+
+def serialize(data: dict[str, list[Package]]) -> dict:
+    """Return a compact representation: field names once, then one row of values per package."""
+    return {
+        'fields': list(Package.FIELDS),
+        **{
+            group: [package.as_row() for package in packages]
+            for group, packages in data.items()
+        }
+    }
+
+
+def deserialize(snapshot: dict) -> dict[str, list[Package]] | None:
+    """Rebuild the coordinator data from a snapshot, or return None when it can not be used."""
+    try:
+        fields = snapshot['fields']
+
+        return {
+            group: [Package(**dict(zip(fields, row))) for row in snapshot[group]]
+            for group in ('receiver', 'sender')
+        }
+    except (KeyError, TypeError) as exception:
+        _LOGGER.warning('Ignoring invalid PostNL snapshot: %s', exception)
+        return None
@@ -0,0 +1,147 @@
+"""Performance statistics of the PostNL integration."""
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .const import LATENCY_BUCKETS
+
+ENDPOINT_GRAPHQL_SHIPMENTS = "graphql_shipments"
+ENDPOINT_TRACK_AND_TRACE = "track_and_trace"
+ENDPOINT_USERINFO = "userinfo"
+ENDPOINT_TOKEN_REFRESH = "token_refresh"
+
+PHASE_AUTH = "auth"
+PHASE_SHIPMENTS = "shipments_query"
+PHASE_FAN_OUT = "fan_out"
+PHASE_SENSOR_RENDERING = "sensor_rendering"
+
+ENDPOINTS = (
+    ENDPOINT_GRAPHQL_SHIPMENTS,
+    ENDPOINT_TRACK_AND_TRACE,
+    ENDPOINT_USERINFO,
+    ENDPOINT_TOKEN_REFRESH,
+)
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed buckets in seconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize the histogram."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean latency, or None without observations."""
+        return self.total / self.count if self.count else None
+
+    def observe(self, seconds: float) -> None:
+        """Record a latency."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[index] += 1
+                return
+
+        self.counts[-1] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a JSON serializable dict."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'max': self.max,
+            'buckets': {
+                **{f"le_{bound}": count for bound, count in zip(self.buckets, self.counts)},
+                'le_inf': self.counts[-1]
+            }
+        }
+
+
+class PostNLStatistics:
+    """Request, retry, cache and cycle statistics of a config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.latencies: dict[str, LatencyHistogram] = {endpoint: LatencyHistogram() for endpoint in ENDPOINTS}
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.not_modified = 0
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.cycle_duration = LatencyHistogram()
+        self.last_cycle_duration: float | None = None
+        self.phases: dict[str, float] = {}
+
+    @property
+    def cache_hit_rate(self) -> float | None:
+        """Return the track and trace cache hit rate in percent."""
+        lookups = self.cache_hits + self.cache_misses
+        return round(100 * self.cache_hits / lookups, 1) if lookups else None
+
+    @contextmanager
+    def measure(self, endpoint: str) -> Iterator[None]:
+        """Count a request to an endpoint and record its latency, including retries."""
+        start = time.monotonic()
+        self.requests[endpoint] += 1
+
+        try:
+            yield
+        except Exception:
+            self.errors[endpoint] += 1
+            raise
+        finally:
+            self.latencies[endpoint].observe(time.monotonic() - start)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record how long a phase of the current update cycle takes."""
+        start = time.monotonic()
+
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.monotonic() - start
+
+    def record_retry(self) -> None:
+        """Count a retried request."""
+        self.retries += 1
+
+    def record_cycle(self, seconds: float, success: bool) -> None:
+        """Record the duration of an update cycle."""
+        self.cycles += 1
+        if not success:
+            self.failed_cycles += 1
+
+        self.last_cycle_duration = seconds
+        self.cycle_duration.observe(seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a JSON serializable dict."""
+        return {
+            'requests': dict(self.requests),
+            'errors': dict(self.errors),
+            'retries': self.retries,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hit_rate,
+            'not_modified': self.not_modified,
+            'cycles': self.cycles,
+            'failed_cycles': self.failed_cycles,
+            'last_cycle_duration': self.last_cycle_duration,
+            'cycle_duration': self.cycle_duration.as_dict(),
+            'last_cycle_phases': self.phases,
+            'latencies': {endpoint: histogram.as_dict() for endpoint, histogram in self.latencies.items()},
+        }
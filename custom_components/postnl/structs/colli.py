@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+def _mapping(value: Any) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+@dataclass(frozen=True, slots=True)
+class Colli:
+    """The part of a track and trace colli the integration uses."""
+
+    found: bool
+    status_message: str = "Unknown"
+    status_phase: int | None = None
+    planned: bool = False
+    planned_date: str | None = None
+    planned_from: str | None = None
+    planned_to: str | None = None
+    expected_datetime: str | None = None
+
+    @classmethod
+    def from_details(cls, details: dict, barcode: str) -> "Colli":
+        """Project a track and trace response down to the colli of a barcode.
+
+        Raises ValueError when the response does not have the expected shape.
+        """
+        if not isinstance(details, dict) or not isinstance(details.get('colli') or {}, dict):
+            raise ValueError("Unexpected track and trace response")
+
+        colli = (details.get('colli') or {}).get(barcode)
+        if not colli:
+            return cls(found=False)
+        if not isinstance(colli, dict):
+            raise ValueError(f"Unexpected colli for {barcode}")
+
+        status_phase = _mapping(colli.get('statusPhase'))
+        route_information = _mapping(colli.get('routeInformation'))
+        eta = _mapping(colli.get('eta'))
+
+        if route_information:
+            window = _mapping(route_information.get('plannedDeliveryTimeWindow'))
+            return cls(
+                found=True,
+                status_message=status_phase.get('message', "Unknown"),
+                status_phase=status_phase.get('index'),
+                planned=True,
+                planned_date=route_information.get('plannedDeliveryTime'),
+                planned_from=window.get('startDateTime'),
+                planned_to=window.get('endDateTime'),
+                expected_datetime=route_information.get('expectedDeliveryTime'),
+            )
+
+        if eta:
+            return cls(
+                found=True,
+                status_message=status_phase.get('message', "Unknown"),
+                status_phase=status_phase.get('index'),
+                planned=True,
+                planned_date=eta.get('start'),
+                planned_from=eta.get('start'),
+                planned_to=eta.get('end'),
+            )
+
+        return cls(
+            found=True,
+            status_message=status_phase.get('message', "Unknown"),
+            status_phase=status_phase.get('index'),
+        )
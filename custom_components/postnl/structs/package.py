@@ -1,41 +1,32 @@
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar
+
+
+@dataclass(frozen=True, slots=True)
 class Package:
+    FIELDS: ClassVar[tuple[str, ...]]
+
     key: str
     name: str
     url: str
     shipment_type: str
     status_message: str
     delivered: bool
-    delivery_date: str | None
-    delivery_address_type: str | None
-    planned_date: str | None
-    planned_from: str | None
-    planned_to: str | None
-    expected_datetime: str | None
+    delivery_date: str | None = None
+    delivery_address_type: str | None = None
+    planned_date: str | None = None
+    planned_from: str | None = None
+    planned_to: str | None = None
+    expected_datetime: str | None = None
+    stale: bool = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the package as a dict of its fields."""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def as_row(self) -> list:
+        """Return the values of the package in FIELDS order."""
+        return [getattr(self, name) for name in self.FIELDS]
+
 
-    def __init__(
-            self,
-            key: str,
-            name: str,
-            url: str,
-            shipment_type: str,
-            status_message: str,
-            delivered: bool,
-            delivery_date: str | None = None,
-            delivery_address_type: str | None = None,
-            planned_date: str | None = None,
-            planned_from: str | None = None,
-            planned_to: str | None = None,
-            expected_datetime: str | None = None,
-    ):
-        self.key = key
-        self.name = name
-        self.url = url
-        self.shipment_type = shipment_type
-        self.status_message = status_message
-        self.delivered = delivered
-        self.delivery_date = delivery_date
-        self.delivery_address_type = delivery_address_type
-        self.planned_date = planned_date
-        self.planned_from = planned_from
-        self.planned_to = planned_to
-        self.expected_datetime = expected_datetime
+Package.FIELDS = tuple(package_field.name for package_field in fields(Package))
@@ -0,0 +1,21 @@
+"""Fixtures for the PostNL tests."""
+import pytest
+
+from custom_components.postnl.structs.package import Package
+
+
+@pytest.fixture
+def make_package():
+    """Return a factory for packages with sensible defaults."""
+    def factory(**kwargs) -> Package:
+        return Package(**{
+            'key': "KEY1",
+            'name': "Package",
+            'url': "https://jouw.postnl.nl/track-and-trace/KEY1",
+            'shipment_type': "Parcel",
+            'status_message': "Pakket is onderweg",
+            'delivered': False,
+            **kwargs
+        })
+
+    return factory
@@ -0,0 +1,68 @@
+"""Tests for the single-flight token refresh."""
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.postnl import AsyncConfigEntryAuth
+from custom_components.postnl.const import DOMAIN
+from custom_components.postnl.stats import PostNLStatistics
+
+
+def _auth(hass: HomeAssistant, entry: MockConfigEntry, refresh) -> AsyncConfigEntryAuth:
+    session = Mock(hass=hass, config_entry=entry, valid_token=False, token={'access_token': "new"})
+    session.async_ensure_token_valid = AsyncMock(side_effect=refresh)
+
+    return AsyncConfigEntryAuth(session, Mock(stats=PostNLStatistics()))
+
+
+async def test_concurrent_callers_share_one_refresh(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    release = asyncio.Event()
+    auth = _auth(hass, entry, release.wait)
+
+    callers = [hass.async_create_task(auth.check_and_refresh_token()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == ["new"] * 3
+    auth.oauth_session.async_ensure_token_valid.assert_awaited_once()
+    auth.http.set_access_token.assert_called_once_with("new")
+    assert auth._refresh_task is None
+
+
+async def test_cancelled_caller_keeps_refresh_running(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    release = asyncio.Event()
+    auth = _auth(hass, entry, release.wait)
+
+    caller = hass.async_create_task(auth.check_and_refresh_token())
+    await asyncio.sleep(0)
+    refresh = auth._refresh_task
+    caller.cancel()
+    await asyncio.sleep(0)
+
+    assert not refresh.done()
+    release.set()
+    await refresh
+    auth.http.set_access_token.assert_called_once_with("new")
+
+
+async def test_refresh_belongs_to_the_config_entry(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    auth = _auth(hass, entry, asyncio.Event().wait)
+
+    caller = hass.async_create_task(auth.check_and_refresh_token())
+    await asyncio.sleep(0)
+    refresh = auth._refresh_task
+
+    await entry._async_process_on_unload(hass)
+
+    await asyncio.sleep(0)
+
+    assert refresh.cancelled()
+    assert caller.cancelled()
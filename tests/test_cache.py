@@ -0,0 +1,91 @@
+"""Tests for the track and trace cache."""
+import time
+from datetime import datetime, timezone
+
+from custom_components.postnl.cache import TrackAndTraceCache
+from custom_components.postnl.const import (STATUS_PHASE_ANNOUNCED,
+                                            TRACK_AND_TRACE_TTL_ANNOUNCED,
+                                            TRACK_AND_TRACE_TTL_DELIVERY_DAY,
+                                            TRACK_AND_TRACE_TTL_IN_TRANSIT)
+from custom_components.postnl.structs.colli import Colli
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_ttl_delivery_day():
+    colli = Colli(found=True, planned_from="2024-05-01T15:00:00+00:00")
+
+    assert TrackAndTraceCache.ttl(colli, NOW) == TRACK_AND_TRACE_TTL_DELIVERY_DAY
+
+
+def test_ttl_overdue():
+    colli = Colli(found=True, planned_from="2024-05-01T08:00:00+00:00", planned_to="2024-05-01T10:00:00+00:00")
+
+    assert TrackAndTraceCache.ttl(colli, NOW) == TRACK_AND_TRACE_TTL_DELIVERY_DAY
+
+
+def test_ttl_long_overdue():
+    colli = Colli(found=True, planned_from="2024-04-25T08:00:00+00:00", planned_to="2024-04-25T10:00:00+00:00")
+
+    assert TrackAndTraceCache.ttl(colli, NOW) == TRACK_AND_TRACE_TTL_IN_TRANSIT
+
+
+def test_ttl_days_away():
+    colli = Colli(found=True, planned_from="2024-05-04T15:00:00+00:00")
+
+    assert TrackAndTraceCache.ttl(colli, NOW) == TRACK_AND_TRACE_TTL_ANNOUNCED
+
+
+def test_ttl_tomorrow():
+    colli = Colli(found=True, planned_from="2024-05-02T09:00:00+00:00")
+
+    assert TrackAndTraceCache.ttl(colli, NOW) == TRACK_AND_TRACE_TTL_IN_TRANSIT
+
+
+def test_ttl_without_window():
+    colli = Colli(found=True, status_phase=STATUS_PHASE_ANNOUNCED)
+
+    assert TrackAndTraceCache.ttl(colli, NOW) == TRACK_AND_TRACE_TTL_ANNOUNCED
+    assert TrackAndTraceCache.ttl(Colli(found=True), NOW) == TRACK_AND_TRACE_TTL_IN_TRANSIT
+
+
+def test_ttl_timestamps_without_offset():
+    colli = Colli(found=True, planned_from="2024-05-04T15:00:00")
+
+    assert TrackAndTraceCache.ttl(colli, NOW.replace(tzinfo=None)) == TRACK_AND_TRACE_TTL_ANNOUNCED
+
+
+def test_get_and_lru_eviction():
+    cache = TrackAndTraceCache(max_size=2)
+    colli = Colli(found=True)
+
+    cache.set("A", colli)
+    cache.set("B", colli)
+    assert cache.get("A") is colli
+    cache.set("C", colli)
+
+    assert cache.get("B") is None
+    assert cache.get("A") is colli
+    assert len(cache) == 2
+
+
+def test_get_expired(monkeypatch):
+    cache = TrackAndTraceCache()
+    cache.set("A", Colli(found=True))
+
+    later = time.monotonic() + TRACK_AND_TRACE_TTL_ANNOUNCED.total_seconds() + 1
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+
+    assert cache.get("A") is None
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = TrackAndTraceCache()
+    cache.set("A", Colli(found=True))
+
+    cache.invalidate("A")
+    cache.invalidate("MISSING")
+
+    assert cache.get("A") is None
+    assert len(cache) == 0
@@ -0,0 +1,64 @@
+"""Tests for the track and trace colli projection."""
+import pytest
+
+from custom_components.postnl.structs.colli import Colli
+
+
+def test_route_information():
+    colli = Colli.from_details({'colli': {'3S1': {
+        'statusPhase': {'index': 2, 'message': "Pakket is onderweg"},
+        'routeInformation': {
+            'plannedDeliveryTime': "2024-05-01T10:00:00+02:00",
+            'plannedDeliveryTimeWindow': {
+                'startDateTime': "2024-05-01T10:00:00+02:00",
+                'endDateTime': "2024-05-01T12:00:00+02:00",
+            },
+            'expectedDeliveryTime': "2024-05-01T10:45:00+02:00",
+        },
+        'observations': [{'description': "Scan"}],
+    }}}, '3S1')
+
+    assert colli == Colli(
+        found=True,
+        status_message="Pakket is onderweg",
+        status_phase=2,
+        planned=True,
+        planned_date="2024-05-01T10:00:00+02:00",
+        planned_from="2024-05-01T10:00:00+02:00",
+        planned_to="2024-05-01T12:00:00+02:00",
+        expected_datetime="2024-05-01T10:45:00+02:00",
+    )
+
+
+def test_eta():
+    colli = Colli.from_details({'colli': {'3S1': {
+        'statusPhase': {'index': 1, 'message': "Aangemeld"},
+        'eta': {'start': "2024-05-01T10:00:00+02:00", 'end': "2024-05-01T12:00:00+02:00"},
+    }}}, '3S1')
+
+    assert colli.planned
+    assert (colli.planned_from, colli.planned_to) == ("2024-05-01T10:00:00+02:00", "2024-05-01T12:00:00+02:00")
+    assert colli.expected_datetime is None
+
+
+def test_without_planning():
+    colli = Colli.from_details({'colli': {'3S1': {'statusPhase': None, 'routeInformation': None}}}, '3S1')
+
+    assert colli == Colli(found=True)
+
+
+def test_barcode_not_found():
+    assert Colli.from_details({'colli': {'3S2': {}}}, '3S1') == Colli(found=False)
+    assert Colli.from_details({'colli': None}, '3S1') == Colli(found=False)
+    assert Colli.from_details({}, '3S1') == Colli(found=False)
+
+
+@pytest.mark.parametrize("details", [
+    None,
+    [],
+    {'colli': ['3S1']},
+    {'colli': {'3S1': "unexpected"}},
+])
+def test_malformed(details):
+    with pytest.raises(ValueError):
+        Colli.from_details(details, '3S1')
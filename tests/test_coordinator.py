@@ -0,0 +1,172 @@
+"""Tests for the shipment helpers of the coordinator."""
+import asyncio
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.postnl.const import DOMAIN
+from custom_components.postnl.coordinator import (PostNLCoordinator,
+                                                  apply_retention,
+                                                  shipment_fingerprint)
+
+
+def _delivered(key: str, age: timedelta | None) -> dict:
+    return {
+        'key': key,
+        'delivered': True,
+        'deliveredTimeStamp': (dt_util.utcnow() - age).isoformat() if age is not None else None,
+    }
+
+
+def test_retention_keeps_in_transit_shipments():
+    shipments = [{'key': "A", 'delivered': False}, _delivered("B", timedelta(days=100))]
+
+    assert apply_retention(shipments, 0, timedelta(days=30)) == [{'key': "A", 'delivered': False}]
+
+
+def test_retention_drops_old_and_keeps_newest():
+    shipments = [
+        _delivered("OLD", timedelta(days=40)),
+        _delivered("NEW", timedelta(days=1)),
+        _delivered("MIDDLE", timedelta(days=5)),
+        _delivered("UNKNOWN", None),
+    ]
+
+    kept = apply_retention(shipments, 2, timedelta(days=30))
+
+    assert [shipment['key'] for shipment in kept] == ["NEW", "MIDDLE"]
+
+
+def test_retention_preserves_order():
+    shipments = [_delivered("A", timedelta(days=3)), _delivered("B", timedelta(days=1))]
+
+    assert apply_retention(shipments, 5, timedelta(days=30)) == shipments
+
+
+def test_retention_accepts_timestamps_without_offset():
+    shipments = [
+        {'key': "A", 'delivered': True, 'deliveredTimeStamp': "2000-01-01T10:00:00"},
+        {'key': "B", 'delivered': True, 'deliveredTimeStamp': dt_util.now().replace(tzinfo=None).isoformat()},
+    ]
+
+    assert [shipment['key'] for shipment in apply_retention(shipments, 5, timedelta(days=30))] == ["B"]
+
+
+def test_fingerprint_ignores_key_order():
+    assert shipment_fingerprint({'key': "A", 'title': "T"}) == shipment_fingerprint({'title': "T", 'key': "A"})
+
+
+def test_fingerprint_changes_with_summary():
+    assert shipment_fingerprint({'key': "A", 'title': "T"}) != shipment_fingerprint({'key': "A", 'title': "U"})
+
+
+def test_fingerprint_is_hashable():
+    fingerprint = shipment_fingerprint({'key': "A", 'delivered': False, 'deliveredTimeStamp': None})
+
+    assert {fingerprint: True}[fingerprint]
+
+
+async def test_stale_package_uses_current_summary(make_package):
+    coordinator = PostNLCoordinator.__new__(PostNLCoordinator)
+    previous = make_package(name="Old title", status_message="Pakket is gesorteerd",
+                            planned_from="2024-05-01T10:00:00+02:00", planned_to="2024-05-01T12:00:00+02:00")
+    coordinator.previous_packages = {"KEY1": (shipment_fingerprint({'key': "KEY1"}), previous, 0.0)}
+
+    async def transform_shipment(shipment, unchanged=None):
+        raise UpdateFailed("PostNL is unavailable")
+
+    coordinator.transform_shipment = transform_shipment
+
+    package = await coordinator.refresh_shipment({
+        'key': "KEY1",
+        'title': "New title",
+        'detailsUrl': "https://jouw.postnl.nl/track-and-trace/KEY1",
+        'shipmentType': "Parcel",
+        'delivered': False,
+    })
+
+    assert package.stale
+    assert package.name == "New title"
+    assert package.status_message == "Pakket is gesorteerd"
+    assert package.planned_from == "2024-05-01T10:00:00+02:00"
+
+
+async def test_summary_package_without_previous():
+    coordinator = PostNLCoordinator.__new__(PostNLCoordinator)
+    coordinator.previous_packages = {}
+
+    async def transform_shipment(shipment, unchanged=None):
+        raise UpdateFailed("PostNL is unavailable")
+
+    coordinator.transform_shipment = transform_shipment
+
+    package = await coordinator.refresh_shipment({
+        'key': "KEY1",
+        'title': "Title",
+        'delivered': False,
+        'deliveryWindowFrom': "2024-05-01T10:00:00+02:00",
+        'deliveryWindowTo': "2024-05-01T12:00:00+02:00",
+    })
+
+    assert package.stale
+    assert package.status_message == "Unknown"
+    assert (package.planned_from, package.planned_to) == ("2024-05-01T10:00:00+02:00", "2024-05-01T12:00:00+02:00")
+
+
+def test_delivered_package_is_reused_until_its_title_or_time_changes():
+    coordinator = PostNLCoordinator.__new__(PostNLCoordinator)
+    coordinator.delivered_packages = {}
+    shipment = {'key': "KEY1", 'title': "Title", 'delivered': True, 'deliveredTimeStamp': "2024-05-01T12:00:00+02:00"}
+
+    package = coordinator.delivered_package(shipment)
+
+    assert coordinator.delivered_package(dict(shipment)) is package
+    assert coordinator.delivered_package({**shipment, 'title': "Renamed"}).name == "Renamed"
+
+
+def _single_flight_coordinator(hass: HomeAssistant, cycle) -> PostNLCoordinator:
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    coordinator = PostNLCoordinator.__new__(PostNLCoordinator)
+    coordinator.hass = hass
+    coordinator.config_entry = entry
+    coordinator.update_task = None
+    coordinator._async_update_cycle = cycle
+
+    return coordinator
+
+
+async def test_concurrent_updates_share_one_cycle(hass: HomeAssistant):
+    release = asyncio.Event()
+    calls = []
+
+    async def cycle():
+        calls.append(None)
+        await release.wait()
+        return {'receiver': [], 'sender': []}
+
+    coordinator = _single_flight_coordinator(hass, cycle)
+    updates = [hass.async_create_task(coordinator._async_update_data()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*updates) == [{'receiver': [], 'sender': []}] * 3
+    assert len(calls) == 1
+    assert coordinator.update_task is None
+
+
+async def test_cycle_is_cancelled_with_the_config_entry(hass: HomeAssistant):
+    coordinator = _single_flight_coordinator(hass, asyncio.Event().wait)
+
+    update = hass.async_create_task(coordinator._async_update_data())
+    await asyncio.sleep(0)
+    cycle = coordinator.update_task
+
+    await coordinator.config_entry._async_process_on_unload(hass)
+    await asyncio.sleep(0)
+
+    assert cycle.cancelled()
+    assert update.cancelled()
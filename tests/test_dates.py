@@ -0,0 +1,28 @@
+"""Tests for the timestamp parsing."""
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.postnl.dates import parse_datetime
+
+
+def test_offset_is_kept():
+    parsed = parse_datetime("2024-05-01T12:00:00+02:00")
+
+    assert parsed.utcoffset() is not None
+    assert dt_util.as_utc(parsed) == dt_util.as_utc(dt_util.parse_datetime("2024-05-01T10:00:00+00:00"))
+
+
+def test_without_offset_is_local():
+    parsed = parse_datetime("2024-05-01T12:00:00")
+
+    assert parsed.tzinfo == dt_util.DEFAULT_TIME_ZONE
+    assert (parsed.hour, parsed.minute) == (12, 0)
+    assert dt_util.now() - parsed > timedelta(0)
+
+
+def test_empty_and_invalid():
+    assert parse_datetime(None) is None
+    assert parse_datetime("") is None
+    assert parse_datetime("not a date") is None
+    assert parse_datetime("2024-13-45T99:00:00") is None
@@ -0,0 +1,58 @@
+"""Tests for the package events."""
+from custom_components.postnl.const import (EVENT_PACKAGE_ADDED,
+                                            EVENT_PACKAGE_DELIVERED,
+                                            EVENT_PACKAGE_REMOVED,
+                                            EVENT_PACKAGE_STATUS_CHANGED,
+                                            EVENT_PACKAGE_WINDOW_MOVED)
+from custom_components.postnl.events import diff_packages
+
+
+def test_unchanged(make_package):
+    packages = {'receiver': [make_package()], 'sender': []}
+
+    assert diff_packages(packages, packages) == []
+
+
+def test_added_and_removed(make_package):
+    events = diff_packages(
+        {'receiver': [make_package(key="OLD")], 'sender': []},
+        {'receiver': [make_package(key="NEW")], 'sender': []},
+    )
+
+    assert [(event_type, data['key'], data['direction']) for event_type, data in events] == [
+        (EVENT_PACKAGE_ADDED, "NEW", 'receiver'),
+        (EVENT_PACKAGE_REMOVED, "OLD", 'receiver'),
+    ]
+
+
+def test_delivered_suppresses_status_change(make_package):
+    events = diff_packages(
+        {'receiver': [make_package()]},
+        {'receiver': [make_package(delivered=True, status_message="Pakket is bezorgd",
+                                   delivery_date="2024-05-01T12:00:00+02:00")]},
+    )
+
+    assert [event_type for event_type, _ in events] == [EVENT_PACKAGE_DELIVERED]
+    assert events[0][1]['delivery_date'] == "2024-05-01T12:00:00+02:00"
+
+
+def test_status_changed_and_window_moved(make_package):
+    events = diff_packages(
+        {'sender': [make_package(planned_from="2024-05-01T10:00:00+02:00", planned_to="2024-05-01T12:00:00+02:00")]},
+        {'sender': [make_package(status_message="Pakket is gesorteerd",
+                                 planned_from="2024-05-01T14:00:00+02:00", planned_to="2024-05-01T16:00:00+02:00")]},
+    )
+
+    assert [event_type for event_type, _ in events] == [EVENT_PACKAGE_STATUS_CHANGED, EVENT_PACKAGE_WINDOW_MOVED]
+    assert events[0][1]['old_status_message'] == "Pakket is onderweg"
+    assert events[1][1]['old_planned_from'] == "2024-05-01T10:00:00+02:00"
+    assert events[1][1]['direction'] == 'sender'
+
+
+def test_packages_are_matched_per_direction(make_package):
+    events = diff_packages(
+        {'receiver': [make_package()], 'sender': []},
+        {'receiver': [], 'sender': [make_package()]},
+    )
+
+    assert sorted(event_type for event_type, _ in events) == sorted([EVENT_PACKAGE_ADDED, EVENT_PACKAGE_REMOVED])
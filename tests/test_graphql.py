@@ -0,0 +1,44 @@
+"""Tests for the PostNL GraphQL client."""
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from custom_components.postnl.exceptions import GraphqlError, GraphqlQueryError
+from custom_components.postnl.graphql import PostNLGraphql
+from custom_components.postnl.http_client import HttpResponse
+from custom_components.postnl.stats import PostNLStatistics
+
+
+def _graphql(body: bytes) -> PostNLGraphql:
+    response = HttpResponse(200, CIMultiDictProxy(CIMultiDict()), body)
+    return PostNLGraphql(Mock(stats=PostNLStatistics(), post=AsyncMock(return_value=response)))
+
+
+async def test_shipments():
+    graphql = _graphql(b'{"data": {"trackedShipments": {"receiverShipments": [], "senderShipments": []}}}')
+
+    assert await graphql.shipments() == {'trackedShipments': {'receiverShipments': [], 'senderShipments': []}}
+
+
+async def test_query_errors():
+    graphql = _graphql(b'{"errors": [{"message": "Unauthorized"}], "data": null}')
+
+    with pytest.raises(GraphqlQueryError) as exc_info:
+        await graphql.shipments()
+
+    assert exc_info.value.errors == [{'message': "Unauthorized"}]
+
+
+@pytest.mark.parametrize("body", [
+    b'<html>Maintenance</html>',
+    b'[]',
+    b'{}',
+    b'{"data": null}',
+    b'{"data": {"somethingElse": {}}}',
+])
+async def test_malformed_responses(body: bytes):
+    with pytest.raises(GraphqlError) as exc_info:
+        await _graphql(body).shipments()
+
+    assert not isinstance(exc_info.value, GraphqlQueryError)
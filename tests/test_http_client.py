@@ -0,0 +1,40 @@
+"""Tests for the shared HTTP client."""
+from aiohttp import hdrs
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+
+from custom_components.postnl.http_client import PostNLHttpClient
+
+
+async def test_user_agent_and_token(hass: HomeAssistant):
+    http = PostNLHttpClient(hass, "token")
+
+    assert http.session.headers[hdrs.USER_AGENT] == SERVER_SOFTWARE
+    assert http.headers == {"Authorization": "Bearer token"}
+
+    http.set_access_token("new")
+    assert http.headers == {"Authorization": "Bearer new"}
+
+    await http.async_close()
+
+
+async def test_closed_when_home_assistant_stops(hass: HomeAssistant):
+    http = PostNLHttpClient(hass, "token")
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert http.session.closed
+    await http.async_close()
+
+
+async def test_close_unsubscribes(hass: HomeAssistant):
+    http = PostNLHttpClient(hass, "token")
+
+    await http.async_close()
+
+    assert http.session.closed
+    assert http._unsub_close is None
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
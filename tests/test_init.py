@@ -0,0 +1,32 @@
+"""Tests for the config entry migration."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.postnl import async_migrate_entry
+from custom_components.postnl.const import CONFIG_ENTRY_VERSION, DOMAIN
+
+
+async def test_migrate_unique_ids(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, version=1)
+    entry.add_to_hass(hass)
+    device = dr.async_get(hass).async_get_or_create(config_entry_id=entry.entry_id, identifiers={(DOMAIN, "account")})
+    entity_registry = er.async_get(hass)
+    old = entity_registry.async_get_or_create(
+        "sensor", DOMAIN, "postnl_delivery", config_entry=entry, device_id=device.id)
+    current = entity_registry.async_get_or_create(
+        "sensor", DOMAIN, "account_distribution", config_entry=entry, device_id=device.id)
+
+    assert await async_migrate_entry(hass, entry)
+
+    assert entry.version == CONFIG_ENTRY_VERSION
+    assert entity_registry.async_get(old.entity_id).unique_id == "account_delivery"
+    assert entity_registry.async_get(current.entity_id).unique_id == "account_distribution"
+
+
+async def test_migrate_from_newer_version(hass: HomeAssistant):
+    entry = MockConfigEntry(domain=DOMAIN, version=CONFIG_ENTRY_VERSION + 1)
+    entry.add_to_hass(hass)
+
+    assert not await async_migrate_entry(hass, entry)
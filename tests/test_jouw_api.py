@@ -0,0 +1,71 @@
+"""Tests for the conditional track and trace lookups."""
+from http import HTTPStatus
+from unittest.mock import AsyncMock, Mock
+
+from aiohttp import hdrs
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from custom_components.postnl.http_client import HttpResponse
+from custom_components.postnl.jouw_api import PostNLJouwAPI
+from custom_components.postnl.stats import PostNLStatistics
+
+BODY = (b'{"colli": {"3S1": {"statusPhase": {"index": 2, "message": "Pakket is onderweg"}, '
+        b'"routeInformation": {"plannedDeliveryTimeWindow": {"startDateTime": "2024-05-01T10:00:00+02:00"}}}}}')
+
+
+def _response(status: int = HTTPStatus.OK, body: bytes = BODY, **headers: str) -> HttpResponse:
+    return HttpResponse(status, CIMultiDictProxy(CIMultiDict(headers)), body)
+
+
+def _api(*responses: HttpResponse) -> PostNLJouwAPI:
+    http = Mock(stats=PostNLStatistics(), get=AsyncMock(side_effect=responses))
+    return PostNLJouwAPI(http)
+
+
+async def test_etag_not_modified():
+    api = _api(_response(**{hdrs.ETAG: '"v1"'}), _response(HTTPStatus.NOT_MODIFIED, b''))
+
+    colli, changed = await api.track_and_trace("KEY1", "3S1")
+    assert changed
+    assert colli.status_message == "Pakket is onderweg"
+    assert colli.planned_from == "2024-05-01T10:00:00+02:00"
+
+    again, changed = await api.track_and_trace("KEY1", "3S1")
+    assert not changed
+    assert again is colli
+    assert api.http.get.call_args.args[1] == {hdrs.IF_NONE_MATCH: '"v1"'}
+
+
+async def test_unchanged_body_without_validators():
+    api = _api(_response(), _response())
+
+    colli, _ = await api.track_and_trace("KEY1", "3S1")
+    again, changed = await api.track_and_trace("KEY1", "3S1")
+
+    assert not changed
+    assert again is colli
+    assert api.http.get.call_args.args[1] == {}
+
+
+async def test_changed_body():
+    api = _api(_response(), _response(body=BODY.replace(b"onderweg", b"bezorgd")))
+
+    await api.track_and_trace("KEY1", "3S1")
+    colli, changed = await api.track_and_trace("KEY1", "3S1")
+
+    assert changed
+    assert colli.status_message == "Pakket is bezorgd"
+
+
+async def test_invalidate_and_size_limit():
+    api = _api(*(_response() for _ in range(3)))
+    api.max_validators = 2
+
+    for key in ("KEY1", "KEY2", "KEY3"):
+        await api.track_and_trace(key, "3S1")
+
+    assert list(api.validators) == ["KEY2", "KEY3"]
+
+    api.invalidate("KEY2")
+    api.invalidate("MISSING")
+    assert list(api.validators) == ["KEY3"]
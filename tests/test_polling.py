@@ -0,0 +1,70 @@
+"""Tests for the adaptive polling interval."""
+from datetime import datetime, timedelta, timezone
+
+from custom_components.postnl.const import UNPLANNED_UPDATE_INTERVAL
+from custom_components.postnl.polling import calculate_update_interval
+
+MIN = timedelta(minutes=1)
+MAX = timedelta(hours=2)
+NOON = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _interval(packages, now=NOON) -> timedelta:
+    return calculate_update_interval(packages, MIN, MAX, now)
+
+
+def test_nothing_en_route(make_package):
+    assert _interval([]) == MAX
+    assert _interval([make_package(delivered=True, planned_from=NOON.isoformat())]) == MAX
+
+
+def test_inside_window(make_package):
+    package = make_package(planned_from="2024-05-01T11:00:00+00:00", planned_to="2024-05-01T13:00:00+00:00")
+
+    assert _interval([package]) == MIN
+
+
+def test_expected_soon(make_package):
+    package = make_package(planned_from="2024-05-03T11:00:00+00:00", expected_datetime="2024-05-01T12:10:00+00:00")
+
+    assert _interval([package]) == MIN
+
+
+def test_backs_off_before_window(make_package):
+    package = make_package(planned_from="2024-05-01T14:30:00+00:00", planned_to="2024-05-01T16:30:00+00:00")
+
+    assert _interval([package]) == timedelta(minutes=30)
+
+
+def test_unplanned(make_package):
+    assert _interval([make_package()]) == UNPLANNED_UPDATE_INTERVAL
+
+
+def test_night(make_package):
+    package = make_package(planned_from="2024-05-02T09:00:00+00:00", planned_to="2024-05-02T11:00:00+00:00")
+
+    assert _interval([package], datetime(2024, 5, 1, 23, 0, tzinfo=timezone.utc)) == MAX
+
+
+def test_overdue(make_package):
+    package = make_package(planned_from="2024-05-01T08:00:00+00:00", planned_to="2024-05-01T10:00:00+00:00")
+
+    assert _interval([package]) == MIN
+
+
+def test_long_overdue(make_package):
+    package = make_package(planned_from="2024-04-25T08:00:00+00:00", planned_to="2024-04-25T10:00:00+00:00")
+
+    assert _interval([package]) == UNPLANNED_UPDATE_INTERVAL
+
+
+def test_overdue_at_night(make_package):
+    package = make_package(planned_from="2024-05-01T20:00:00+00:00", planned_to="2024-05-01T22:00:00+00:00")
+
+    assert _interval([package], datetime(2024, 5, 2, 0, 0, tzinfo=timezone.utc)) == MAX
+
+
+def test_timestamps_without_offset(make_package):
+    package = make_package(planned_from="2024-05-01T11:00:00", planned_to="2024-05-01T13:00:00")
+
+    assert _interval([package]) == MIN
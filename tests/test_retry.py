@@ -0,0 +1,104 @@
+"""Tests for the retry policy and circuit breaker."""
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from custom_components.postnl.retry import (CircuitBreaker, CircuitOpenError,
+                                            RetryPolicy, is_retryable)
+
+
+def _response_error(status: int) -> ClientResponseError:
+    return ClientResponseError(Mock(), (), status=status)
+
+
+def _failing(*exceptions: BaseException):
+    """Return a coroutine function raising the exceptions in turn, then returning "ok"."""
+    remaining = list(exceptions)
+
+    async def func():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+
+    return func
+
+
+def test_is_retryable():
+    assert is_retryable(_response_error(503))
+    assert is_retryable(_response_error(429))
+    assert is_retryable(ClientConnectionError())
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(_response_error(401))
+    assert not is_retryable(ValueError())
+
+
+def test_breaker_opens_and_resets(monkeypatch):
+    breaker = CircuitBreaker("jouw.postnl.nl", failure_threshold=2, reset_timeout=timedelta(seconds=60))
+
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert 0 < exc_info.value.retry_after <= 60
+
+    later = time.monotonic() + 61
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+    breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.failures == 0
+    assert breaker.opened_at is None
+
+
+def test_delay_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+
+    assert all(0 <= policy.delay(attempt) <= 5 for attempt in range(10))
+
+
+async def test_retries_transient_failures():
+    breaker = CircuitBreaker("host")
+    on_retry = Mock()
+
+    result = await RetryPolicy(attempts=3, base_delay=0, max_delay=0).call(
+        breaker, _failing(_response_error(503), ClientConnectionError()), on_retry=on_retry)
+
+    assert result == "ok"
+    assert on_retry.call_count == 2
+    assert breaker.failures == 0
+
+
+async def test_gives_up_after_attempts():
+    breaker = CircuitBreaker("host", failure_threshold=10)
+
+    with pytest.raises(ClientResponseError):
+        await RetryPolicy(attempts=2, base_delay=0, max_delay=0).call(
+            breaker, _failing(*(_response_error(503) for _ in range(3))))
+
+    assert breaker.failures == 2
+
+
+async def test_does_not_retry_other_errors():
+    breaker = CircuitBreaker("host")
+
+    with pytest.raises(ClientResponseError):
+        await RetryPolicy(attempts=3, base_delay=0, max_delay=0).call(breaker, _failing(_response_error(404)))
+
+    assert breaker.failures == 0
+
+
+async def test_open_circuit_skips_call():
+    breaker = CircuitBreaker("host", failure_threshold=1)
+    breaker.record_failure()
+    func = Mock()
+
+    with pytest.raises(CircuitOpenError):
+        await RetryPolicy().call(breaker, func)
+
+    func.assert_not_called()
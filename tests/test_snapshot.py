@@ -0,0 +1,57 @@
+"""Tests for the persisted coordinator snapshot."""
+from unittest.mock import AsyncMock, Mock, patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.postnl.coordinator import PostNLCoordinator
+from custom_components.postnl.snapshot import (async_get_snapshot_store,
+                                               async_remove_snapshot,
+                                               deserialize, serialize)
+
+
+def test_round_trip(make_package):
+    data = {
+        'receiver': [make_package(), make_package(key="KEY2", delivered=True, stale=True)],
+        'sender': [make_package(key="KEY3", planned_from="2024-05-01T10:00:00+02:00")],
+    }
+
+    snapshot = serialize(data)
+
+    assert snapshot['fields'][0] == 'key'
+    assert deserialize(snapshot) == data
+
+
+def test_invalid_snapshot():
+    assert deserialize({}) is None
+    assert deserialize({'fields': ['key'], 'receiver': [["KEY1"]], 'sender': []}) is None
+    assert deserialize({'fields': ['key', 'name', 'url', 'shipment_type', 'status_message', 'delivered'],
+                        'receiver': None, 'sender': []}) is None
+
+
+async def test_store_is_shared_per_entry(hass: HomeAssistant):
+    store = async_get_snapshot_store(hass, "entry")
+
+    assert async_get_snapshot_store(hass, "entry") is store
+    assert async_get_snapshot_store(hass, "other") is not store
+
+
+async def test_remove_uses_the_shared_store(hass: HomeAssistant):
+    store = async_get_snapshot_store(hass, "entry")
+
+    with patch.object(store, "async_remove") as async_remove:
+        await async_remove_snapshot(hass, "entry")
+
+    async_remove.assert_awaited_once()
+    assert async_get_snapshot_store(hass, "entry") is not store
+
+
+async def test_flush_writes_pending_snapshot_once(make_package):
+    coordinator = PostNLCoordinator.__new__(PostNLCoordinator)
+    coordinator.data = {'receiver': [make_package()], 'sender': []}
+    coordinator.store = Mock(async_save=AsyncMock())
+    coordinator.snapshot_pending = True
+
+    await coordinator.async_flush_snapshot()
+    await coordinator.async_flush_snapshot()
+
+    coordinator.store.async_save.assert_awaited_once_with(serialize(coordinator.data))